@@ -1,28 +1,39 @@
-from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+import time
+
+# Taken before anything heavy is imported, for the import-time report.
+import_started = time.monotonic()
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from utils.logger import logger
 import uvicorn
-from config import get_port
-from typing import List, Dict
-from chains.image_search_agent import handle_image_search
-from chains.suggestion_generator_agent import (
-    generate_suggestions,
-    SuggestionGeneratorInput,
-)
-from chains.video_search_agent import handle_video_search
-from langchain.schema import HumanMessage, AIMessage, BaseMessage
-from langchain_openai import ChatOpenAI
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from config import get_port, get_warmup
+from db.index import init_db, close_db
+from utils.profiler import ProfilerMiddleware
+from utils.warmup import warmup
+from lib.ollama_catalog import ollama_catalog
+from lib.model_cache import chat_model_cache
+from routes.chats import router as chats_router
 from routes.config_route import router as config_router
 from routes.discover import router as discover_router
 from routes.images import router as image_router
+from routes.media import router as media_router
 from routes.models import router as model_router
+from routes.profiles import router as profile_router
+from routes.search import router as search_router
 from routes.suggestions import router as suggestion_router
 from routes.uploads import router as upload_router
 from routes.videos import router as video_router
 
+import_duration = time.monotonic() - import_started
+logger.info("App modules imported in %.2fs", import_duration)
+
 app = FastAPI()
 
+app.add_middleware(ProfilerMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -32,12 +43,48 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def startup():
+    await init_db()
+
+    if get_warmup():
+        warmup.start()
+
+    # Only runs when OLLAMA_HOT_MODELS is set.
+    ollama_catalog.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await warmup.stop()
+    await ollama_catalog.stop()
+    await chat_model_cache.aclose()
+    await close_db()
+
+
 @app.get("/api")
 async def get_status():
-    logger.info("API status endpoint hit")
+    logger.debug("API status endpoint hit", extra={"rate_limit": "status"})
     return {"status": "ok"}
 
 
+@app.get("/api/health")
+async def get_health():
+    # Deliberately touches no dependency: it answers as soon as the app is
+    # imported, while models and providers are still loaded on demand.
+    return {
+        "status": "ok",
+        "uptime": round(time.monotonic() - import_started, 4),
+        "import_time": round(import_duration, 4),
+        "warmup": warmup.to_dict(),
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     logger.error(f"Uncaught exception occured: {exc}")
@@ -47,10 +94,14 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+app.include_router(chats_router, prefix="/api/chats", tags=["chats"])
 app.include_router(config_router, prefix="/api/config", tags=["config"])
 app.include_router(discover_router, prefix="/api/discover", tags=["discover"])
 app.include_router(image_router, prefix="/api/images", tags=["images"])
+app.include_router(media_router, prefix="/api/media", tags=["media"])
 app.include_router(model_router, prefix="/api/models", tags=["models"])
+app.include_router(profile_router, prefix="/api/profiles", tags=["profiles"])
+app.include_router(search_router, prefix="/api/search", tags=["search"])
 app.include_router(suggestion_router, prefix="/api/suggestions", tags=["suggestions"])
 app.include_router(upload_router, prefix="/api/uploads", tags=["uploads"])
 app.include_router(video_router, prefix="/api/videos", tags=["videos"])
@@ -0,0 +1,281 @@
+import asyncio
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from config import config, get_rerank_model
+from lib.cross_encoder import get_cross_encoder_reranker
+from lib.providers.main import chat_model_providers, embedding_model_providers
+
+follow_up_regex = re.compile(r"Follow up question:\s*(.+)")
+word_regex = re.compile(r"\w+")
+
+FILLER = (
+    "According to the sources the topic has been studied extensively and the "
+    "results point in a consistent direction with several caveats worth noting"
+).split()
+
+
+def words(text: str) -> set:
+    return set(word_regex.findall(text.lower()))
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic chat model that answers each prompt used in this project
+    with a canned response, streamed word by word after `first_token_delay`
+    at `tokens_per_second`.
+    """
+
+    model_name: str = "fake-chat"
+    temperature: float = 0.7
+    first_token_delay: float = 0.2
+    tokens_per_second: float = 50.0
+    answer_tokens: int = 200
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def respond(self, messages: List[BaseMessage]) -> str:
+        prompt = "\n".join(str(message.content) for message in messages)
+        follow_ups = follow_up_regex.findall(prompt)
+        query = follow_ups[-1].strip() if follow_ups else ""
+
+        if "<suggestions>" in prompt:
+            suggestions = "\n".join(
+                f"Tell me more about point {i} of the answer" for i in range(1, 5)
+            )
+            return f"<suggestions>\n{suggestions}\n</suggestions>"
+
+        if "<question>" in prompt and query:
+            return f"<question>\n{query}\n</question>"
+
+        if "Rephrased question:" in prompt and query:
+            return query
+
+        if "<text>" in prompt:
+            return " ".join(FILLER)
+
+        answer = [
+            FILLER[i % len(FILLER)] + (f" [{i // 20 + 1}]." if i % 20 == 19 else "")
+            for i in range(self.answer_tokens)
+        ]
+        return " ".join(answer)
+
+    def tokens(self, text: str) -> List[str]:
+        parts = text.split(" ")
+        return [part + " " for part in parts[:-1]] + parts[-1:]
+
+    def delays(self, count: int) -> Iterator[float]:
+        yield self.first_token_delay
+        for _ in range(count - 1):
+            yield 1 / self.tokens_per_second
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self.respond(messages)
+        time.sleep(sum(self.delays(len(self.tokens(text)))))
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))]
+        )
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        text = self.respond(messages)
+        await asyncio.sleep(sum(self.delays(len(self.tokens(text)))))
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=text))]
+        )
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        tokens = self.tokens(self.respond(messages))
+        for token, delay in zip(tokens, self.delays(len(tokens))):
+            time.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        tokens = self.tokens(self.respond(messages))
+        for token, delay in zip(tokens, self.delays(len(tokens))):
+            await asyncio.sleep(delay)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words vectors, so related texts get similar embeddings."""
+
+    def __init__(self, dimensions: int = 384, delay: float = 0.01):
+        self.dimensions = dimensions
+        self.delay = delay
+        self.model = "fake-embeddings"
+
+    def embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        for word in word_regex.findall(text.lower()):
+            digest = hashlib.md5(word.encode("utf-8")).digest()
+            vector[int.from_bytes(digest[:4], "little") % self.dimensions] += 1.0
+
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.delay)
+        return [self.embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        time.sleep(self.delay)
+        return self.embed(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        await asyncio.sleep(self.delay)
+        return [self.embed(text) for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await asyncio.sleep(self.delay)
+        return self.embed(text)
+
+
+class FakeCrossEncoder:
+    """Stands in for sentence_transformers.CrossEncoder inside the reranker."""
+
+    def __init__(self, delay_per_pair: float = 0.002):
+        self.delay_per_pair = delay_per_pair
+
+    def predict(self, pairs: List[Tuple[str, str]], batch_size: int = 32):
+        time.sleep(self.delay_per_pair * len(pairs))
+        return [len(words(query) & words(text)) for query, text in pairs]
+
+
+class FakeSearxng:
+    """
+    Local HTTP server answering /search like SearxNG's JSON API. Every
+    result carries the fields the web, image and video handlers look for.
+    """
+
+    def __init__(self, latency: float = 0.1, num_results: int = 20):
+        self.latency = latency
+        self.num_results = num_results
+        self.server: Optional[ThreadingHTTPServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def results(self, query: str) -> Dict[str, Any]:
+        slug = "-".join(word_regex.findall(query.lower())) or "query"
+
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"{query} - result {i}",
+                    "url": f"https://example.com/{slug}/{i}",
+                    "content": f"{query}. " + " ".join(FILLER[: 5 + i % 15]),
+                    "img_src": f"https://example.com/{slug}/{i}.jpg",
+                    "thumbnail": f"https://example.com/{slug}/{i}-thumb.jpg",
+                    "iframe_src": f"https://example.com/embed/{slug}/{i}",
+                }
+                for i in range(self.num_results)
+            ],
+            "suggestions": [],
+        }
+
+    def start(self) -> "FakeSearxng":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path != "/search":
+                    self.send_error(404)
+                    return
+
+                time.sleep(fake.latency)
+                query = parse_qs(url.query).get("q", [""])[0]
+                body = json.dumps(fake.results(query)).encode("utf-8")
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+def install_fakes(
+    llm: FakeChatModel, embeddings: FakeEmbeddings, search_latency: float
+) -> FakeSearxng:
+    """
+    Points the app at a fresh FakeSearxng and makes the fakes the only
+    registered model providers. Returns the server so the caller can stop it.
+    """
+    searxng = FakeSearxng(latency=search_latency).start()
+    config.API_ENDPOINTS["SEARXNG"] = searxng.url
+    config.GENERAL["ANSWER_CACHE_ENABLED"] = False
+    get_cross_encoder_reranker(get_rerank_model()).model = FakeCrossEncoder()
+
+    # Loaders build a new dict per call because /api/models pops "model".
+    async def load_fake_chat_models():
+        return {"fake-chat": {"displayName": "Fake Chat", "model": llm}}
+
+    async def load_fake_embeddings_models():
+        return {
+            "fake-embeddings": {"displayName": "Fake Embeddings", "model": embeddings}
+        }
+
+    chat_model_providers.clear()
+    chat_model_providers["fake"] = load_fake_chat_models
+    embedding_model_providers.clear()
+    embedding_model_providers["fake"] = load_fake_embeddings_models
+
+    return searxng
@@ -0,0 +1,303 @@
+"""
+HTTP load test for the FastAPI routes, with local stand-ins for every
+external service (see benchmarks.fakes). Run from src/:
+
+    # in-process, through httpx's ASGI transport
+    python -m benchmarks.load --requests 200 --concurrency 16
+
+    # over localhost: start a server with the stand-ins, then drive it
+    python -m benchmarks.load --serve --port 8765
+    python -m benchmarks.load --base-url http://127.0.0.1:8765
+
+Each route is driven on its own at the given concurrency. Per route, the
+JSON report has latency percentiles and a cumulative histogram, status
+codes, error rate, throughput, and event-loop lag sampled while that route
+was under load. Lag is the server's in-process and the client's over
+localhost.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import httpx
+import config as config_module
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, install_fakes
+from benchmarks.stats import histogram, summarize
+
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+LAG_INTERVAL = 0.01
+
+FAKE_CHAT_MODEL = {"provider": "fake", "model": "fake-chat"}
+
+
+@dataclass
+class RouteSpec:
+    name: str
+    method: str
+    path: str
+    request: Callable[[int], Dict[str, Any]] = lambda i: {}
+    writes_config: bool = False
+
+
+def chat_history(i: int) -> List[Dict[str, str]]:
+    return [
+        {"role": "user", "content": f"What is Docker? #{i}"},
+        {"role": "assistant", "content": "Docker is a container platform."},
+    ]
+
+
+ROUTES = [
+    RouteSpec("discover", "GET", "/api/discover/"),
+    RouteSpec(
+        "images",
+        "POST",
+        "/api/images/",
+        lambda i: {
+            "json": {
+                "query": f"Docker containers #{i}",
+                "chatModel": FAKE_CHAT_MODEL,
+            }
+        },
+    ),
+    RouteSpec(
+        "videos",
+        "POST",
+        "/api/videos/",
+        lambda i: {
+            "json": {
+                "query": f"Docker containers #{i}",
+                "chatModel": FAKE_CHAT_MODEL,
+            }
+        },
+    ),
+    RouteSpec(
+        "suggestions",
+        "POST",
+        "/api/suggestions/",
+        lambda i: {
+            "json": {"chatHistory": chat_history(i), "chatModel": FAKE_CHAT_MODEL}
+        },
+    ),
+    RouteSpec(
+        "uploads",
+        "POST",
+        "/api/uploads/",
+        lambda i: {
+            "files": [
+                ("files", (f"notes-{i}.txt", b"Docker packages software. " * 200))
+            ],
+            "data": {
+                "embedding_model": "fake-embeddings",
+                "embedding_model_provider": "fake",
+            },
+        },
+    ),
+    RouteSpec("models", "GET", "/api/models/"),
+    RouteSpec("config", "GET", "/api/config/"),
+    RouteSpec(
+        "config:update",
+        "POST",
+        "/api/config/",
+        lambda i: {"json": {"ollamaApiUrl": "http://127.0.0.1:11434"}},
+        writes_config=True,
+    ),
+]
+
+
+@dataclass
+class RouteResult:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    loop_lag: List[float] = field(default_factory=list)
+
+
+async def sample_loop_lag(samples: List[float], stop: asyncio.Event):
+    while not stop.is_set():
+        started = time.monotonic()
+        await asyncio.sleep(LAG_INTERVAL)
+        samples.append(max(0.0, time.monotonic() - started - LAG_INTERVAL))
+
+
+async def drive_route(
+    client: httpx.AsyncClient, route: RouteSpec, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    result = RouteResult()
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+
+    async def send(i: int):
+        async with semaphore:
+            started = time.monotonic()
+            try:
+                response = await client.request(
+                    route.method, route.path, **route.request(i)
+                )
+                result.statuses[response.status_code] += 1
+                if response.status_code >= 400:
+                    result.errors += 1
+            except httpx.HTTPError as e:
+                logging.getLogger(__name__).error(f"{route.name} failed: {e}")
+                result.statuses["transport_error"] += 1
+                result.errors += 1
+            result.latencies.append(time.monotonic() - started)
+
+    lag_sampler = asyncio.create_task(sample_loop_lag(result.loop_lag, stop))
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(send(i) for i in range(requests)))
+    finally:
+        wall_time = time.monotonic() - started
+        stop.set()
+        await lag_sampler
+
+    return {
+        "method": route.method,
+        "path": route.path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "wall_time": round(wall_time, 4),
+        "requests_per_second": round(requests / wall_time, 4),
+        "error_rate": round(result.errors / requests, 4),
+        "statuses": {str(status): n for status, n in result.statuses.items()},
+        "latency": summarize(result.latencies),
+        "latency_histogram": histogram(result.latencies, LATENCY_BUCKETS),
+        "loop_lag": summarize(result.loop_lag),
+    }
+
+
+def create_fakes(args: argparse.Namespace):
+    llm = FakeChatModel(
+        first_token_delay=args.first_token_delay,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+    )
+    embeddings = FakeEmbeddings(delay=args.embedding_latency)
+    return install_fakes(llm, embeddings, args.search_latency)
+
+
+def sandbox_files(workdir: str):
+    """
+    Keeps uploads and POST /api/config away from the real tree: uploads are
+    written relative to the working directory, the config to a copy.
+    """
+    config_path = os.path.join(workdir, config_module.config_file_name)
+    shutil.copy(config_module.config_file_path, config_path)
+    config_module.config_file_path = config_path
+
+    os.makedirs(os.path.join(workdir, "uploads"), exist_ok=True)
+    os.chdir(workdir)
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    searxng = None
+    in_process = not args.base_url
+
+    if in_process:
+        from app import app
+
+        searxng = create_fakes(args)
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://loadtest"
+    else:
+        transport = None
+        base_url = args.base_url
+
+    routes = [
+        route
+        for route in ROUTES
+        if (not args.routes or route.name in args.routes)
+        and (in_process or not route.writes_config or args.allow_config_writes)
+    ]
+
+    results = {}
+    try:
+        async with httpx.AsyncClient(
+            transport=transport, base_url=base_url, timeout=args.timeout
+        ) as client:
+            for route in routes:
+                results[route.name] = await drive_route(
+                    client, route, args.requests, args.concurrency
+                )
+    finally:
+        if searxng:
+            searxng.stop()
+
+    return {
+        "settings": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "loop_lag_measured_in": "server" if in_process else "client",
+        "routes": results,
+    }
+
+
+def serve(args: argparse.Namespace):
+    import uvicorn
+    from app import app
+
+    searxng = create_fakes(args)
+    try:
+        uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+    finally:
+        searxng.stop()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument(
+        "--routes", nargs="*", help="Route names to drive, e.g. images models"
+    )
+    parser.add_argument("--base-url", help="Drive a running server instead")
+    parser.add_argument(
+        "--allow-config-writes",
+        action="store_true",
+        help="Also POST /api/config when driving a running server",
+    )
+    parser.add_argument("--serve", action="store_true")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first-token-delay", type=float, default=0.05)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--answer-tokens", type=int, default=50)
+    parser.add_argument("--search-latency", type=float, default=0.05)
+    parser.add_argument("--embedding-latency", type=float, default=0.005)
+    parser.add_argument("--output", help="Write the JSON report here")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("app_logger").setLevel(logging.WARNING)
+
+    if args.output:
+        args.output = os.path.abspath(args.output)
+
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    try:
+        sandbox_files(workdir)
+
+        if args.serve:
+            serve(args)
+        else:
+            report = json.dumps(asyncio.run(run(args)), indent=2)
+
+            if args.output:
+                with open(args.output, "w") as f:
+                    f.write(report)
+            else:
+                print(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
@@ -0,0 +1,198 @@
+"""
+Offline latency benchmark for the search pipeline and the media chains.
+
+Everything external is replaced by the fakes in benchmarks.fakes, so runs are
+deterministic and need no network. Run from src/:
+
+    python -m benchmarks.pipeline --iterations 50 --concurrency 4
+
+Results are printed (or written to --output) as JSON: per scenario, the
+latency percentiles of every stage, time to first sources/token, total
+time, and throughput.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+from langchain_core.messages import AIMessage, HumanMessage
+from benchmarks.fakes import FakeChatModel, FakeEmbeddings, install_fakes
+from benchmarks.stats import summarize
+from search.event_bus import EventType
+from search.handlers import search_handlers
+from chains.image_search_agent import handle_image_search
+from chains.video_search_agent import handle_video_search
+from chains.suggestion_generator_agent import (
+    generate_suggestions,
+    SuggestionGeneratorInput,
+)
+
+QUERIES = [
+    "What is Docker and how does it work",
+    "History of the printing press",
+    "How do vaccines train the immune system",
+    "Best practices for PostgreSQL indexing",
+    "Why is the sky blue",
+]
+
+Timings = Dict[str, float]
+
+
+def get_query(iteration: int) -> str:
+    # A unique suffix keeps the rephrase cache from turning runs into hits.
+    return f"{QUERIES[iteration % len(QUERIES)]} #{iteration}"
+
+
+def search_scenario(focus_mode: str, optimization_mode: str, llm, embeddings):
+    agent = search_handlers[focus_mode]
+
+    async def run(iteration: int) -> Tuple[Timings, int]:
+        started = time.monotonic()
+        timings: Timings = {}
+        tokens = 0
+
+        async for event in agent.stream_search_and_answer(
+            get_query(iteration), [], llm, embeddings, optimization_mode, []
+        ):
+            elapsed = time.monotonic() - started
+            if event.type == EventType.SOURCES:
+                timings.setdefault("first_sources", elapsed)
+            elif event.type == EventType.CHUNK:
+                timings.setdefault("first_token", elapsed)
+                tokens += 1
+            elif event.type == EventType.TIMING:
+                for stage in event.data["stages"]:
+                    name = f"stage:{stage['name']}"
+                    timings[name] = timings.get(name, 0) + stage["duration"]
+
+        timings["total"] = time.monotonic() - started
+        return timings, tokens
+
+    return run
+
+
+def chain_scenario(handler: Callable[[str], Awaitable[Any]]):
+    async def run(iteration: int) -> Tuple[Timings, int]:
+        started = time.monotonic()
+        await handler(get_query(iteration))
+        return {"total": time.monotonic() - started}, 0
+
+    return run
+
+
+async def run_scenario(
+    run: Callable[[int], Awaitable[Tuple[Timings, int]]],
+    iterations: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(concurrency)
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    tokens = 0
+
+    async def run_once(iteration: int):
+        nonlocal errors, tokens
+        async with semaphore:
+            try:
+                timings, count = await run(iteration)
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Benchmark run failed: {e}")
+                errors += 1
+                return
+
+        tokens += count
+        for name, value in timings.items():
+            samples[name].append(value)
+
+    started = time.monotonic()
+    await asyncio.gather(*(run_once(i) for i in range(iterations)))
+    wall_time = time.monotonic() - started
+
+    return {
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "wall_time": round(wall_time, 4),
+        "requests_per_second": round((iterations - errors) / wall_time, 4),
+        "tokens_per_second": round(tokens / wall_time, 4),
+        "latency": {name: summarize(values) for name, values in samples.items()},
+    }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    llm = FakeChatModel(
+        first_token_delay=args.first_token_delay,
+        tokens_per_second=args.tokens_per_second,
+        answer_tokens=args.answer_tokens,
+    )
+    embeddings = FakeEmbeddings(delay=args.embedding_latency)
+    searxng = install_fakes(llm, embeddings, args.search_latency)
+
+    scenarios = {
+        f"search:{mode}": search_scenario("webSearch", mode, llm, embeddings)
+        for mode in ("speed", "balanced", "quality")
+    }
+    scenarios["images"] = chain_scenario(
+        lambda query: handle_image_search({"query": query, "chat_history": []}, llm)
+    )
+    scenarios["videos"] = chain_scenario(
+        lambda query: handle_video_search({"query": query, "chat_history": []}, llm)
+    )
+    scenarios["suggestions"] = chain_scenario(
+        lambda query: generate_suggestions(
+            SuggestionGeneratorInput(
+                chat_history=[HumanMessage(content=query), AIMessage(content=query)]
+            ),
+            llm,
+        )
+    )
+
+    results = {}
+    try:
+        for name, run in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = await run_scenario(run, args.iterations, args.concurrency)
+    finally:
+        searxng.stop()
+
+    return {
+        "settings": {
+            key: value for key, value in vars(args).items() if key != "output"
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--first-token-delay", type=float, default=0.2)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--answer-tokens", type=int, default=200)
+    parser.add_argument("--search-latency", type=float, default=0.1)
+    parser.add_argument("--embedding-latency", type=float, default=0.01)
+    parser.add_argument(
+        "--only", nargs="*", help="Scenario names to run, e.g. search:speed images"
+    )
+    parser.add_argument("--output", help="Write the JSON report here")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("app_logger").setLevel(logging.WARNING)
+
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
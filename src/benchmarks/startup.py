@@ -0,0 +1,107 @@
+"""
+Import-time report for the server. Run from src/:
+
+    python -m benchmarks.startup --top 25
+
+Imports `app` in a fresh interpreter under `python -X importtime` and
+reports the wall time of the import, plus the modules with the largest
+cumulative and self import times. Heavy libraries (torch, transformers,
+provider integrations) should not appear: they are loaded on first use.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+WATCHED_MODULES = [
+    "torch",
+    "transformers",
+    "sentence_transformers",
+    "langchain_google_genai",
+    "langchain_anthropic",
+    "langchain_ollama",
+    "langchain_community",
+    "pdfplumber",
+    "eventlet",
+]
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        modules.append(
+            {
+                "module": name.strip(),
+                "self": int(self_us) / 1e6,
+                "cumulative": int(cumulative_us) / 1e6,
+            }
+        )
+
+    return modules
+
+
+def measure(module: str) -> Dict[str, Any]:
+    started = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    wall_time = time.monotonic() - started
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    return {"wall_time": wall_time, "modules": parse_importtime(result.stderr)}
+
+
+def report(module: str, top: int) -> Dict[str, Any]:
+    measured = measure(module)
+    modules = measured["modules"]
+    imported = {entry["module"] for entry in modules}
+
+    def rank(key: str) -> List[Dict[str, Any]]:
+        ranked = sorted(modules, key=lambda entry: entry[key], reverse=True)
+        return [
+            {"module": entry["module"], key: round(entry[key], 4)}
+            for entry in ranked[:top]
+        ]
+
+    return {
+        "module": module,
+        "wall_time": round(measured["wall_time"], 4),
+        "modules_imported": len(modules),
+        "heavy_modules_imported": [
+            name for name in WATCHED_MODULES if name in imported
+        ],
+        "top_cumulative": rank("cumulative"),
+        "top_self": rank("self"),
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="app", help="Module to import")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--output", help="Write the JSON report here")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    output = json.dumps(report(args.module, args.top), indent=2)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
@@ -0,0 +1,58 @@
+from typing import List
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.language_models.chat_models import BaseChatModel
+from utils.format_history import format_chat_history_as_string
+from utils.logger import logger
+from lib.chain_cache import get_or_create_chain, get_model_id, get_prompt_version
+from lib.llm_scheduler import Priority, llm_priority
+
+history_summarizer_prompt = """
+You are maintaining a running summary of a conversation between a user and an AI powered search engine. You will be given the current summary (which may be empty) and the messages that happened after it.
+Update the summary so that it covers both. Keep the topics the user is interested in, the questions they asked, the key facts and conclusions from the answers, and any preferences or constraints they stated. Drop greetings, formatting and citations.
+Write the summary as a few short paragraphs in the third person and keep it under 300 words. Only return the summary.
+
+<summary>
+{summary}
+</summary>
+
+<messages>
+{chat_history}
+</messages>
+"""
+
+prompt_template = PromptTemplate(
+    input_variables=["summary", "chat_history"], template=history_summarizer_prompt
+)
+
+str_parser = StrOutputParser()
+
+
+async def summarize_history(
+    summary: str, messages: List[BaseMessage], llm: BaseChatModel
+) -> str:
+    try:
+        chain = get_or_create_chain(
+            (
+                "historySummary",
+                get_prompt_version(history_summarizer_prompt),
+                get_model_id(llm),
+            ),
+            lambda: prompt_template | llm | str_parser,
+        )
+
+        with llm_priority(Priority.SUMMARIES):
+            updated_summary = await chain.ainvoke(
+                {
+                    "summary": summary,
+                    "chat_history": format_chat_history_as_string(messages),
+                }
+            )
+
+        logger.info(f"Summarized {len(messages)} messages into the chat summary.")
+        return updated_summary.strip()
+
+    except Exception as e:
+        logger.error(f"Error in summarize_history: {e}")
+        raise
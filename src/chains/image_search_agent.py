@@ -6,6 +6,9 @@ from langchain.chains.llm import LLMChain
 from utils.format_history import format_chat_history_as_string
 from utils.logger import logger
 from lib.searxng import search_searxng, SearxngSearchOptions
+from lib.chain_cache import get_or_create_chain, get_model_id, get_prompt_version
+from lib.rephrase_cache import cached_rephrase, get_rephrase_key
+from utils.metrics import set_trace_labels, span
 
 image_search_chain_prompt = """
 You will be given a conversation below and a follow up question. You need to rephrase the follow-up question so it is a standalone question that can be used by the LLM to search the web for images.
@@ -34,10 +37,17 @@ prompt_template = PromptTemplate(
 
 
 def create_llm_chain(llm: BaseChatModel) -> LLMChain:
-    return LLMChain(
-        llm=llm,
-        prompt=prompt_template,
-        output_key="rephrased_query",
+    return get_or_create_chain(
+        (
+            "imageSearch",
+            get_prompt_version(image_search_chain_prompt),
+            get_model_id(llm),
+        ),
+        lambda: LLMChain(
+            llm=llm,
+            prompt=prompt_template,
+            output_key="rephrased_query",
+        ),
     )
 
 
@@ -59,29 +69,55 @@ async def search_images(rephrased_query: str) -> List[Dict[str, str]]:
                 }
             )
 
-    logger.info(f"Found {len(images)} images for query: '{rephrased_query}'")
+    logger.info(
+        "Found %d images for query: '%s'",
+        len(images),
+        rephrased_query,
+        extra={"sample": True},
+    )
     return images[:10]
 
 
-async def handle_image_search(
+async def rephrase_image_query(
     input_data: Dict[str, Any], llm: BaseChatModel
-) -> List[Dict[str, str]]:
-    try:
-        formatted_history = format_chat_history_as_string(input_data["chat_history"])
-        logger.debug(f"Formatted chat history: {formatted_history}")
+) -> str:
+    formatted_history = input_data.get(
+        "formatted_history"
+    ) or format_chat_history_as_string(input_data["chat_history"])
+
+    llm_chain = create_llm_chain(llm)
+    set_trace_labels(llm, "images")
+
+    async def rephrase() -> str:
+        with span("rephrase"):
+            chain_output = await llm_chain.arun(
+                {
+                    "chat_history": formatted_history,
+                    "query": input_data["query"],
+                }
+            )
+
+        return str_parser.parse(chain_output)
+
+    rephrased_query = await cached_rephrase(
+        get_rephrase_key(
+            llm,
+            image_search_chain_prompt,
+            input_data["chat_history"],
+            input_data["query"],
+        ),
+        rephrase,
+    )
+    logger.debug("Rephrased query: '%s'", rephrased_query)
 
-        llm_chain = create_llm_chain(llm)
+    return rephrased_query
 
-        chain_output = await llm_chain.arun(
-            {
-                "chat_history": formatted_history,
-                "query": input_data["query"],
-            }
-        )
-        logger.debug(f"Chain output: {chain_output}")
 
-        rephrased_query = str_parser.parse(chain_output)
-        logger.info(f"Rephrased query: '{rephrased_query}")
+async def handle_image_search(
+    input_data: Dict[str, Any], llm: BaseChatModel
+) -> List[Dict[str, str]]:
+    try:
+        rephrased_query = await rephrase_image_query(input_data, llm)
 
         images = await search_images(rephrased_query)
 
@@ -1,11 +1,21 @@
-from typing import List
+import asyncio
+from typing import List, Optional
 from langchain_core.messages import BaseMessage
 from langchain_core.prompts import PromptTemplate
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain.chains.llm import LLMChain
 from lib.output_parsers.list_line_output_parser import LineListOutputParser
 from utils.logger import logger
+from utils.cache import LRUCache
+from utils.metrics import register_cache, set_trace_labels, span
 from utils.format_history import format_chat_history_as_string
+from lib.chain_cache import (
+    get_or_create_chain,
+    get_model_id,
+    get_prompt_version,
+    with_temperature,
+)
+from lib.llm_scheduler import Priority, llm_priority
 
 suggestion_generator_prompt = """
 You are an AI suggestion generator for an AI powered search engine. You will be given a conversation below. You need to generate 4-5 suggestions based on the conversation. The suggestion should be relevant to the conversation that can be used by the user to ask the chat model for more information.
@@ -26,20 +36,35 @@ Conversation:
 
 
 class SuggestionGeneratorInput:
-    def __init__(self, chat_history: List[BaseMessage]):
+    def __init__(
+        self, chat_history: List[BaseMessage], formatted_history: Optional[str] = None
+    ):
         self.chat_history = chat_history
+        self.formatted_history = formatted_history
 
 
 output_parser = LineListOutputParser(key="suggestions")
 
+precomputed_suggestions = LRUCache(max_size=1024, ttl=600)
+register_cache("suggestions", precomputed_suggestions)
+
 prompt_template = PromptTemplate(
     input_variables=["chat_history"], template=suggestion_generator_prompt
 )
 
 
 def create_suggestion_generator_chain(llm: BaseChatModel) -> LLMChain:
-    return LLMChain(
-        llm=llm, prompt=prompt_template, output_parser=output_parser, verbose=True
+    return get_or_create_chain(
+        (
+            "suggestions",
+            get_prompt_version(suggestion_generator_prompt),
+            get_model_id(llm),
+        ),
+        lambda: LLMChain(
+            llm=with_temperature(llm, 0),
+            prompt=prompt_template,
+            output_parser=output_parser,
+        ),
     )
 
 
@@ -47,21 +72,50 @@ async def generate_suggestions(
     input_data: SuggestionGeneratorInput, llm: BaseChatModel
 ) -> List[str]:
     try:
-        if hasattr(llm, "temperature"):
-            llm.temperature = 0
-
-        formatted_history = format_chat_history_as_string(input_data.chat_history)
-        logger.debug(f"Formatted chat history: {formatted_history}")
+        formatted_history = (
+            input_data.formatted_history
+            or format_chat_history_as_string(input_data.chat_history)
+        )
 
         suggestion_generator_chain = create_suggestion_generator_chain(llm)
+        set_trace_labels(llm, "suggestions")
 
-        suggestions = suggestion_generator_chain.run(
-            {"chat_history": formatted_history}
-        )
+        with span("suggestions"), llm_priority(Priority.SUGGESTIONS):
+            suggestions = await suggestion_generator_chain.arun(
+                {"chat_history": formatted_history}
+            )
 
-        logger.info(f"Generated {len(suggestions)} suggestions.")
+        logger.info(
+            "Generated %d suggestions.", len(suggestions), extra={"sample": True}
+        )
         return suggestions
 
     except Exception as e:
         logger.error(f"Error in generate_suggestions: {e}")
         raise
+
+
+def precompute_suggestions(
+    message_id: str, chat_history: List[BaseMessage], llm: BaseChatModel
+) -> asyncio.Task:
+    task = asyncio.create_task(
+        generate_suggestions(SuggestionGeneratorInput(chat_history=chat_history), llm)
+    )
+    # Failures surface when the suggestions are requested, not as unretrieved
+    # task exceptions.
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    precomputed_suggestions.set(message_id, task)
+
+    return task
+
+
+async def get_precomputed_suggestions(message_id: str) -> Optional[List[str]]:
+    task = precomputed_suggestions.get(message_id)
+    if task is None:
+        return None
+
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        precomputed_suggestions.pop(message_id)
+        return None
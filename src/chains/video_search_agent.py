@@ -6,6 +6,9 @@ from langchain.chains.llm import LLMChain
 from utils.format_history import format_chat_history_as_string
 from utils.logger import logger
 from lib.searxng import search_searxng, SearxngSearchOptions
+from lib.chain_cache import get_or_create_chain, get_model_id, get_prompt_version
+from lib.rephrase_cache import cached_rephrase, get_rephrase_key
+from utils.metrics import set_trace_labels, span
 
 video_search_chain_prompt = """
 You will be given a conversation below and a follow up question. You need to rephrase the follow-up question so it is a standalone question that can be used by the LLM to search Youtube for videos.
@@ -34,8 +37,15 @@ prompt_template = PromptTemplate(
 
 
 def create_llm_chain(llm: BaseChatModel) -> LLMChain:
-    return LLMChain(
-        llm=llm, prompt=prompt_template, output_key="rephrased_query", verbose=True
+    return get_or_create_chain(
+        (
+            "videoSearch",
+            get_prompt_version(video_search_chain_prompt),
+            get_model_id(llm),
+        ),
+        lambda: LLMChain(
+            llm=llm, prompt=prompt_template, output_key="rephrased_query", verbose=True
+        ),
     )
 
 
@@ -63,7 +73,12 @@ async def search_videos(rephrased_query: str) -> List[Dict[str, str]]:
                 }
             )
 
-    logger.info(f"Found {len(videos)} videos for query: '{rephrased_query}'")
+    logger.info(
+        "Found %d videos for query: '%s'",
+        len(videos),
+        rephrased_query,
+        extra={"sample": True},
+    )
     return videos[:10]
 
 
@@ -71,21 +86,32 @@ async def handle_video_search(
     input_data: Dict[str, Any], llm: BaseChatModel
 ) -> List[Dict[str, str]]:
     try:
+        set_trace_labels(llm, "videos")
         formatted_history = format_chat_history_as_string(input_data["chat_history"])
-        logger.debug(f"Formatted chat history: {formatted_history}")
 
         llm_chain = create_llm_chain(llm)
 
-        chain_output = await llm_chain.arun(
-            {
-                "chat_history": formatted_history,
-                "query": input_data["query"],
-            }
+        async def rephrase() -> str:
+            with span("rephrase"):
+                chain_output = await llm_chain.arun(
+                    {
+                        "chat_history": formatted_history,
+                        "query": input_data["query"],
+                    }
+                )
+
+            return str_parser.parse(chain_output)
+
+        rephrased_query = await cached_rephrase(
+            get_rephrase_key(
+                llm,
+                video_search_chain_prompt,
+                input_data["chat_history"],
+                input_data["query"],
+            ),
+            rephrase,
         )
-        logger.debug(f"Chain output: {chain_output}")
-
-        rephrased_query = str_parser.parse(chain_output)
-        logger.info(f"Rephrased query: '{rephrased_query}")
+        logger.debug("Rephrased query: '%s'", rephrased_query)
 
         videos = await search_videos(rephrased_query=rephrased_query)
 
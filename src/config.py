@@ -10,9 +10,17 @@ config_file_path = os.path.join(parent_dir, config_file_name)
 
 class Config:
     def __init__(self, config_data):
+        self.load(config_data)
+
+    def load(self, config_data):
         self.GENERAL = config_data.get("GENERAL", {})
         self.API_KEYS = config_data.get("API_KEYS", {})
         self.API_ENDPOINTS = config_data.get("API_ENDPOINTS", {})
+        self.DATABASE = config_data.get("DATABASE", {})
+        self.LOGGING = config_data.get("LOGGING", {})
+        self.PROFILING = config_data.get("PROFILING", {})
+        self.RATE_LIMITS = config_data.get("RATE_LIMITS", {})
+        self.FAILOVER = config_data.get("FAILOVER", {})
 
     @property
     def PORT(self):
@@ -26,6 +34,70 @@ class Config:
     def KEEP_ALIVE(self):
         return self.GENERAL.get("KEEP_ALIVE", "5m")
 
+    @property
+    def OLLAMA_HOT_MODELS(self):
+        return self.GENERAL.get("OLLAMA_HOT_MODELS", [])
+
+    @property
+    def OLLAMA_CATALOG_TTL(self):
+        return self.GENERAL.get("OLLAMA_CATALOG_TTL", 30)
+
+    @property
+    def RERANK_MODEL(self):
+        return self.GENERAL.get("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+
+    @property
+    def RERANK_BUDGET(self):
+        return self.GENERAL.get("RERANK_BUDGET", 1.5)
+
+    @property
+    def HISTORY_TURNS(self):
+        return self.GENERAL.get("HISTORY_TURNS", 6)
+
+    @property
+    def HISTORY_TOKEN_LIMIT(self):
+        return self.GENERAL.get("HISTORY_TOKEN_LIMIT", 2000)
+
+    @property
+    def HISTORY_SUMMARY_THRESHOLD(self):
+        return self.GENERAL.get("HISTORY_SUMMARY_THRESHOLD", 1000)
+
+    @property
+    def REPHRASE_CACHE_SIZE(self):
+        return self.GENERAL.get("REPHRASE_CACHE_SIZE", 2048)
+
+    @property
+    def REPHRASE_CACHE_TTL(self):
+        return self.GENERAL.get("REPHRASE_CACHE_TTL", 600)
+
+    @property
+    def ANSWER_CACHE_ENABLED(self):
+        return self.GENERAL.get("ANSWER_CACHE_ENABLED", False)
+
+    @property
+    def ANSWER_CACHE_THRESHOLD(self):
+        return self.GENERAL.get("ANSWER_CACHE_THRESHOLD", 0.95)
+
+    @property
+    def ANSWER_CACHE_TTL(self):
+        return self.GENERAL.get("ANSWER_CACHE_TTL", 300)
+
+    @property
+    def ANSWER_CACHE_MAX_ENTRIES(self):
+        return self.GENERAL.get("ANSWER_CACHE_MAX_ENTRIES", 256)
+
+    @property
+    def SPECULATIVE_SEARCH(self):
+        return self.GENERAL.get("SPECULATIVE_SEARCH", False)
+
+    @property
+    def SPECULATIVE_SEARCH_THRESHOLD(self):
+        return self.GENERAL.get("SPECULATIVE_SEARCH_THRESHOLD", 0.8)
+
+    @property
+    def WARMUP(self):
+        return self.GENERAL.get("WARMUP", False)
+
     @property
     def OPENAI_API_KEY(self):
         return self.API_KEYS.get("OPENAI", "")
@@ -50,6 +122,97 @@ class Config:
     def OLLAMA_API_ENDPOINT(self):
         return self.API_ENDPOINTS.get("OLLAMA", "")
 
+    @property
+    def DATABASE_URL(self):
+        return self.DATABASE.get(
+            "URL",
+            f"sqlite+aiosqlite:///{os.path.join(parent_dir, 'data', 'db.sqlite')}",
+        )
+
+    @property
+    def DATABASE_POOL_SIZE(self):
+        return self.DATABASE.get("POOL_SIZE", 5)
+
+    @property
+    def DATABASE_MAX_OVERFLOW(self):
+        return self.DATABASE.get("MAX_OVERFLOW", 10)
+
+    @property
+    def DATABASE_WRITE_BATCH_SIZE(self):
+        return self.DATABASE.get("WRITE_BATCH_SIZE", 200)
+
+    @property
+    def DATABASE_WRITE_INTERVAL(self):
+        return self.DATABASE.get("WRITE_INTERVAL", 0.5)
+
+    @property
+    def LOG_LEVEL(self):
+        return self.LOGGING.get("LEVEL", "INFO")
+
+    @property
+    def LOG_FORMAT(self):
+        return self.LOGGING.get("FORMAT", "text")
+
+    @property
+    def LOG_FILE(self):
+        return self.LOGGING.get("FILE", "app.log")
+
+    @property
+    def LOG_SAMPLE_RATE(self):
+        return self.LOGGING.get("SAMPLE_RATE", 0.1)
+
+    @property
+    def LOG_RATE_LIMIT(self):
+        return self.LOGGING.get("RATE_LIMIT", 1.0)
+
+    @property
+    def PROFILER_TOKEN(self):
+        return self.PROFILING.get("TOKEN", "")
+
+    @property
+    def PROFILER_SAMPLE_RATE(self):
+        return self.PROFILING.get("SAMPLE_RATE", 0.0)
+
+    @property
+    def PROFILER_INTERVAL(self):
+        return self.PROFILING.get("INTERVAL", 0.005)
+
+    @property
+    def PROFILER_DIR(self):
+        return self.PROFILING.get("DIR", os.path.join(parent_dir, "data", "profiles"))
+
+    @property
+    def PROFILER_MAX_REPORTS(self):
+        return self.PROFILING.get("MAX_REPORTS", 50)
+
+    @property
+    def FAILOVER_ENABLED(self):
+        return self.FAILOVER.get("ENABLED", False)
+
+    @property
+    def FAILOVER_FALLBACKS(self):
+        return self.FAILOVER.get("FALLBACKS", [])
+
+    @property
+    def FAILOVER_HEDGE_DELAY(self):
+        return self.FAILOVER.get("HEDGE_DELAY", 2.0)
+
+    @property
+    def FAILOVER_ERROR_THRESHOLD(self):
+        return self.FAILOVER.get("ERROR_THRESHOLD", 0.5)
+
+    @property
+    def FAILOVER_MIN_REQUESTS(self):
+        return self.FAILOVER.get("MIN_REQUESTS", 10)
+
+    @property
+    def FAILOVER_WINDOW(self):
+        return self.FAILOVER.get("WINDOW", 60)
+
+    @property
+    def FAILOVER_COOLDOWN(self):
+        return self.FAILOVER.get("COOLDOWN", 30)
+
 
 def load_config():
     config_data = toml.load(config_file_path)
@@ -71,6 +234,9 @@ def update_config(updated_config):
     with open(config_file_path, "w") as f:
         toml.dump(current_config, f)
 
+    # Reloaded in place, since modules hold on to the `config` object.
+    config.load(current_config)
+
 
 config = load_config()
 
@@ -103,9 +269,165 @@ def get_keep_alive():
     return config.KEEP_ALIVE
 
 
+def get_ollama_hot_models():
+    return config.OLLAMA_HOT_MODELS
+
+
+def get_ollama_catalog_ttl():
+    return config.OLLAMA_CATALOG_TTL
+
+
 def get_openai_api_key():
     return config.OPENAI_API_KEY
 
 
 def get_similarity_measure():
     return config.SIMILARITY_MEASURE
+
+
+def get_rerank_model():
+    return config.RERANK_MODEL
+
+
+def get_rerank_budget():
+    return config.RERANK_BUDGET
+
+
+def get_database_url():
+    return config.DATABASE_URL
+
+
+def get_database_pool_size():
+    return config.DATABASE_POOL_SIZE
+
+
+def get_database_max_overflow():
+    return config.DATABASE_MAX_OVERFLOW
+
+
+def get_database_write_batch_size():
+    return config.DATABASE_WRITE_BATCH_SIZE
+
+
+def get_database_write_interval():
+    return config.DATABASE_WRITE_INTERVAL
+
+
+def get_log_level():
+    return config.LOG_LEVEL
+
+
+def get_log_format():
+    return config.LOG_FORMAT
+
+
+def get_log_file():
+    return config.LOG_FILE
+
+
+def get_log_sample_rate():
+    return config.LOG_SAMPLE_RATE
+
+
+def get_log_rate_limit():
+    return config.LOG_RATE_LIMIT
+
+
+def get_profiler_token():
+    return config.PROFILER_TOKEN
+
+
+def get_profiler_sample_rate():
+    return config.PROFILER_SAMPLE_RATE
+
+
+def get_profiler_interval():
+    return config.PROFILER_INTERVAL
+
+
+def get_profiler_dir():
+    return config.PROFILER_DIR
+
+
+def get_profiler_max_reports():
+    return config.PROFILER_MAX_REPORTS
+
+
+def get_rate_limits():
+    return config.RATE_LIMITS
+
+
+def get_failover_enabled():
+    return config.FAILOVER_ENABLED
+
+
+def get_failover_fallbacks():
+    return config.FAILOVER_FALLBACKS
+
+
+def get_failover_hedge_delay():
+    return config.FAILOVER_HEDGE_DELAY
+
+
+def get_failover_error_threshold():
+    return config.FAILOVER_ERROR_THRESHOLD
+
+
+def get_failover_min_requests():
+    return config.FAILOVER_MIN_REQUESTS
+
+
+def get_failover_window():
+    return config.FAILOVER_WINDOW
+
+
+def get_failover_cooldown():
+    return config.FAILOVER_COOLDOWN
+
+
+def get_history_turns():
+    return config.HISTORY_TURNS
+
+
+def get_history_token_limit():
+    return config.HISTORY_TOKEN_LIMIT
+
+
+def get_history_summary_threshold():
+    return config.HISTORY_SUMMARY_THRESHOLD
+
+
+def get_rephrase_cache_size():
+    return config.REPHRASE_CACHE_SIZE
+
+
+def get_rephrase_cache_ttl():
+    return config.REPHRASE_CACHE_TTL
+
+
+def get_answer_cache_enabled():
+    return config.ANSWER_CACHE_ENABLED
+
+
+def get_answer_cache_threshold():
+    return config.ANSWER_CACHE_THRESHOLD
+
+
+def get_answer_cache_ttl():
+    return config.ANSWER_CACHE_TTL
+
+
+def get_answer_cache_max_entries():
+    return config.ANSWER_CACHE_MAX_ENTRIES
+
+
+def get_speculative_search():
+    return config.SPECULATIVE_SEARCH
+
+
+def get_speculative_search_threshold():
+    return config.SPECULATIVE_SEARCH_THRESHOLD
+
+
+def get_warmup():
+    return config.WARMUP
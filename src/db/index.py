@@ -0,0 +1,225 @@
+import asyncio
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from config import (
+    get_database_url,
+    get_database_pool_size,
+    get_database_max_overflow,
+    get_database_write_batch_size,
+    get_database_write_interval,
+)
+from db.schema import Base, Chat, Message
+from utils.logger import logger
+from utils.metrics import register_queue
+
+database_url = make_url(get_database_url())
+is_sqlite = database_url.get_backend_name() == "sqlite"
+is_memory = is_sqlite and database_url.database in (None, "", ":memory:")
+
+if is_sqlite and not is_memory:
+    os.makedirs(
+        os.path.dirname(os.path.abspath(database_url.database)), exist_ok=True
+    )
+
+# In-memory SQLite gets a StaticPool, which takes no pool sizing arguments.
+pool_options = (
+    {}
+    if is_memory
+    else {
+        "pool_size": get_database_pool_size(),
+        "max_overflow": get_database_max_overflow(),
+    }
+)
+
+engine = create_async_engine(
+    database_url,
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    **pool_options,
+)
+
+async_session = async_sessionmaker(
+    engine, expire_on_commit=False, class_=AsyncSession
+)
+
+
+if is_sqlite:
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+# Longest wait between attempts to write a batch the database rejected.
+MAX_RETRY_DELAY = 30.0
+
+
+class WriteBehindQueue:
+    """
+    Buffers chat and message rows and writes them in batches. The batch
+    being written is kept in `in_flight` until it is committed: a failed
+    batch is retried, ahead of newer rows, and `flush()` writes it together
+    with everything still queued so that readers never miss a row.
+    """
+
+    def __init__(self, batch_size: int = 200, interval: float = 0.5):
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+        self.in_flight: List[Tuple[str, Dict[str, Any]]] = []
+        self.lock = asyncio.Lock()
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            # Holding the lock keeps the writer from being cancelled halfway
+            # through a transaction.
+            async with self.lock:
+                self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        await self.flush()
+
+    def put(self, kind: str, row: Dict[str, Any]):
+        self.queue.put_nowait((kind, row))
+
+    async def flush(self):
+        """
+        Writes the in-flight batch and everything queued. Errors are raised
+        to the caller, and the rows are kept for the writer to retry.
+        """
+        async with self.lock:
+            while self.in_flight or not self.queue.empty():
+                self.in_flight.extend(self._drain())
+                await self._write(self.in_flight)
+                self.in_flight = []
+
+    def _drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        batch = []
+        while (
+            len(self.in_flight) + len(batch) < self.batch_size
+            and not self.queue.empty()
+        ):
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        failures = 0
+        while True:
+            if not self.in_flight:
+                self.in_flight = [await self.queue.get()]
+
+            # Give concurrent streams a moment to pile up rows so that they
+            # share a single transaction.
+            await asyncio.sleep(self.interval)
+
+            async with self.lock:
+                self.in_flight.extend(self._drain())
+                try:
+                    await self._write(self.in_flight)
+                except Exception as e:
+                    failures += 1
+                    logger.error(
+                        f"Error writing {len(self.in_flight)} rows to the "
+                        f"database, retrying (attempt {failures}): {e}"
+                    )
+                else:
+                    self.in_flight = []
+                    failures = 0
+
+            if failures:
+                await asyncio.sleep(
+                    min(self.interval * 2**failures, MAX_RETRY_DELAY)
+                )
+
+    async def _write(self, batch: List[Tuple[str, Dict[str, Any]]]):
+        if not batch:
+            return
+
+        chats = {row["id"]: row for kind, row in batch if kind == "chat"}
+        messages = [row for kind, row in batch if kind == "message"]
+
+        async with async_session() as session:
+            async with session.begin():
+                if chats:
+                    existing_ids = set(
+                        await session.scalars(
+                            select(Chat.id).where(Chat.id.in_(chats.keys()))
+                        )
+                    )
+                    new_chats = [
+                        row
+                        for chat_id, row in chats.items()
+                        if chat_id not in existing_ids
+                    ]
+                    if new_chats:
+                        await session.execute(insert(Chat), new_chats)
+
+                if messages:
+                    # Messages carry ids derived from the request, so a
+                    # retried request does not store its messages twice.
+                    existing_messages = {
+                        tuple(row)
+                        for row in await session.execute(
+                            select(Message.messageId, Message.role).where(
+                                Message.messageId.in_(
+                                    {row["messageId"] for row in messages}
+                                )
+                            )
+                        )
+                    }
+                    new_messages = {
+                        (row["messageId"], row["role"]): row
+                        for row in messages
+                        if (row["messageId"], row["role"]) not in existing_messages
+                    }
+                    if new_messages:
+                        await session.execute(
+                            insert(Message), list(new_messages.values())
+                        )
+
+
+write_queue = WriteBehindQueue(
+    batch_size=get_database_write_batch_size(),
+    interval=get_database_write_interval(),
+)
+register_queue(
+    "db_writes", lambda: write_queue.queue.qsize() + len(write_queue.in_flight)
+)
+
+
+async def init_db():
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+        # create_all skips indexes on tables that already exist.
+        for index in Message.__table__.indexes:
+            await connection.run_sync(index.create, checkfirst=True)
+
+    write_queue.start()
+    logger.info("Database initialized successfully.")
+
+
+async def close_db():
+    await write_queue.stop()
+    await engine.dispose()
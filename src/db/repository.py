@@ -0,0 +1,192 @@
+import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import delete, select, update
+from db.index import async_session, write_queue
+from db.schema import Chat, Message, RoleEnum
+
+
+def chat_to_dict(chat: Chat) -> Dict[str, Any]:
+    return {
+        "id": chat.id,
+        "title": chat.title,
+        "createdAt": chat.createdAt,
+        "focusMode": chat.focusMode,
+        "files": chat.files or [],
+    }
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    return {
+        "id": message.id,
+        "content": message.content,
+        "chatId": message.chatId,
+        "messageId": message.messageId,
+        "role": message.role.value if message.role else None,
+        "metadata": message.meta or {},
+    }
+
+
+def save_chat(chat_id: str, title: str, focus_mode: str, files: List[Any] = None):
+    write_queue.put(
+        "chat",
+        {
+            "id": chat_id,
+            "title": title,
+            "createdAt": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "focusMode": focus_mode,
+            "files": files or [],
+        },
+    )
+
+
+def save_message(
+    chat_id: str,
+    message_id: str,
+    role: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]] = None,
+):
+    write_queue.put(
+        "message",
+        {
+            "chatId": chat_id,
+            "messageId": message_id,
+            "role": RoleEnum(role),
+            "content": content,
+            "meta": {
+                "createdAt": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                **(metadata or {}),
+            },
+        },
+    )
+
+
+async def get_chats() -> List[Dict[str, Any]]:
+    await write_queue.flush()
+
+    async with async_session() as session:
+        chats = await session.scalars(select(Chat).order_by(Chat.createdAt.desc()))
+        return [chat_to_dict(chat) for chat in chats]
+
+
+async def get_chat(chat_id: str) -> Optional[Dict[str, Any]]:
+    await write_queue.flush()
+
+    async with async_session() as session:
+        chat = await session.get(Chat, chat_id)
+        if not chat:
+            return None
+
+        messages = await session.scalars(
+            select(Message).where(Message.chatId == chat_id).order_by(Message.id)
+        )
+
+        return {
+            "chat": chat_to_dict(chat),
+            "messages": [message_to_dict(message) for message in messages],
+        }
+
+
+async def get_history_window(chat_id: str, turns: int) -> Dict[str, Any]:
+    await write_queue.flush()
+
+    async with async_session() as session:
+        recent = list(
+            await session.scalars(
+                select(Message)
+                .where(Message.chatId == chat_id)
+                .order_by(Message.id.desc())
+                .limit(turns * 2)
+            )
+        )
+        recent.reverse()
+
+        # The first user message anchors the topic of the conversation even
+        # after it has scrolled out of the window.
+        anchor = await session.scalar(
+            select(Message)
+            .where(Message.chatId == chat_id, Message.role == RoleEnum.user)
+            .order_by(Message.id)
+            .limit(1)
+        )
+
+        return {
+            "anchor": message_to_dict(anchor) if anchor is not None else None,
+            "messages": [message_to_dict(message) for message in recent],
+        }
+
+
+async def get_messages_between(
+    chat_id: str, after_id: int, before_id: int, limit: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    # With a limit, the latest messages in the range are the ones kept.
+    async with async_session() as session:
+        messages = list(
+            await session.scalars(
+                select(Message)
+                .where(
+                    Message.chatId == chat_id,
+                    Message.id > after_id,
+                    Message.id < before_id,
+                )
+                .order_by(Message.id.desc())
+                .limit(limit)
+            )
+        )
+        messages.reverse()
+        return [message_to_dict(message) for message in messages]
+
+
+async def save_history_summary(anchor_id: int, summary: str, summarized_up_to: int):
+    async with async_session() as session:
+        async with session.begin():
+            anchor = await session.get(Message, anchor_id)
+            if anchor is None:
+                return
+
+            await session.execute(
+                update(Message)
+                .where(Message.id == anchor_id)
+                .values(
+                    meta={
+                        **(anchor.meta or {}),
+                        "summary": summary,
+                        "summarizedUpTo": summarized_up_to,
+                    }
+                )
+            )
+
+
+async def get_messages_page(
+    chat_id: str, before: Optional[int] = None, limit: int = 50
+) -> Dict[str, Any]:
+    await write_queue.flush()
+
+    query = select(Message).where(Message.chatId == chat_id)
+    if before is not None:
+        query = query.where(Message.id < before)
+
+    async with async_session() as session:
+        messages = list(
+            await session.scalars(query.order_by(Message.id.desc()).limit(limit + 1))
+        )
+
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+    messages.reverse()
+
+    return {
+        "messages": [message_to_dict(message) for message in messages],
+        "nextCursor": messages[0].id if has_more else None,
+    }
+
+
+async def delete_chat(chat_id: str) -> bool:
+    await write_queue.flush()
+
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(delete(Message).where(Message.chatId == chat_id))
+            result = await session.execute(delete(Chat).where(Chat.id == chat_id))
+
+    return result.rowcount > 0
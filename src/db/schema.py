@@ -6,6 +6,7 @@ from sqlalchemy import (
     Enum,
     JSON,
     ForeignKey,
+    Index,
     create_engine,
 )
 from sqlalchemy.ext.declarative import declarative_base
@@ -36,12 +37,15 @@ class Chat(Base):
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_chatId_id", "chatId", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
-    chatId = Column(String, ForeignKey("chats.id"), nullable=False, index=True)
+    chatId = Column(String, ForeignKey("chats.id"), nullable=False)
     messageId = Column(String, nullable=False, index=True)
     role = Column(Enum(RoleEnum), nullable=True)
-    metadata = Column(JSON, nullable=True)
+    # "metadata" is reserved on declarative classes, so the attribute is
+    # renamed while the column keeps its name.
+    meta = Column("metadata", JSON, nullable=True)
 
     chat = relationship("Chat", back_populates="messages")
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from db.index import WriteBehindQueue
+
+
+class FakeDatabase:
+    """Stands in for WriteBehindQueue._write, failing the first `failures` calls."""
+
+    def __init__(self, failures: int = 0):
+        self.failures = failures
+        self.batches = []
+
+    async def write(self, batch):
+        if not batch:
+            return
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database is locked")
+        self.batches.append(list(batch))
+
+    @property
+    def rows(self):
+        return [row for batch in self.batches for row in batch]
+
+
+def make_queue(database: FakeDatabase) -> WriteBehindQueue:
+    queue = WriteBehindQueue(batch_size=10, interval=0.01)
+    queue._write = database.write
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_write_behind_queue_batches_rows():
+    database = FakeDatabase()
+    queue = make_queue(database)
+    queue.start()
+
+    queue.put("chat", {"id": "chat"})
+    queue.put("message", {"messageId": "1"})
+    await asyncio.sleep(0.05)
+    await queue.stop()
+
+    assert database.batches == [
+        [("chat", {"id": "chat"}), ("message", {"messageId": "1"})]
+    ]
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_the_in_flight_batch_first():
+    database = FakeDatabase()
+    queue = make_queue(database)
+    queue.start()
+
+    queue.put("chat", {"id": "chat"})
+    # Let the writer take the chat row off the queue.
+    await asyncio.sleep(0)
+    queue.put("message", {"messageId": "1"})
+    await queue.flush()
+
+    assert database.rows == [
+        ("chat", {"id": "chat"}),
+        ("message", {"messageId": "1"}),
+    ]
+    assert not queue.in_flight
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried():
+    database = FakeDatabase(failures=2)
+    queue = make_queue(database)
+    queue.start()
+
+    queue.put("message", {"messageId": "1"})
+    await asyncio.sleep(0.2)
+    await queue.stop()
+
+    assert database.rows == [("message", {"messageId": "1"})]
+
+
+@pytest.mark.asyncio
+async def test_flush_raises_and_keeps_rows():
+    database = FakeDatabase(failures=1)
+    queue = make_queue(database)
+
+    queue.put("message", {"messageId": "1"})
+    with pytest.raises(RuntimeError):
+        await queue.flush()
+
+    assert queue.in_flight == [("message", {"messageId": "1"})]
+    await queue.flush()
+    assert database.rows == [("message", {"messageId": "1"})]
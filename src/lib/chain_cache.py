@@ -0,0 +1,76 @@
+import hashlib
+from typing import Any, Callable, Hashable, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from utils.cache import LRUCache
+from utils.metrics import register_cache
+
+chain_cache = LRUCache(max_size=256)
+register_cache("chains", chain_cache)
+
+
+def get_prompt_version(prompt: Any) -> str:
+    return hashlib.sha1(str(prompt).encode("utf-8")).hexdigest()[:12]
+
+
+def get_model_id(llm: BaseChatModel) -> str:
+    inner = getattr(llm, "inner", None)
+    if isinstance(inner, BaseChatModel):
+        return f"{type(llm).__name__}({get_model_id(inner)})"
+
+    model = (
+        getattr(llm, "model_name", None)
+        or getattr(llm, "model", None)
+        or type(llm).__name__
+    )
+    base_url = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+
+    api_key = ""
+    for attr in ("openai_api_key", "anthropic_api_key", "google_api_key", "api_key"):
+        value = getattr(llm, attr, None)
+        if value:
+            api_key = (
+                value.get_secret_value()
+                if hasattr(value, "get_secret_value")
+                else str(value)
+            )
+            break
+
+    key_hash = hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:8]
+    temperature = getattr(llm, "temperature", None)
+
+    return f"{type(llm).__name__}:{model}:{base_url or ''}:{key_hash}:{temperature}"
+
+
+def with_temperature(llm: BaseChatModel, temperature: float) -> BaseChatModel:
+    """
+    Returns a copy of `llm` that samples at `temperature`. Models are shared
+    across requests and chains, so they are never changed in place.
+    """
+    wrapped = getattr(llm, "with_temperature", None)
+    if wrapped is not None:
+        return wrapped(temperature)
+
+    if getattr(llm, "temperature", temperature) == temperature:
+        return llm
+
+    return llm.model_copy(update={"temperature": temperature})
+
+
+def get_or_create_chain(key: Tuple[Hashable, ...], builder: Callable[[], Any]) -> Any:
+    chain = chain_cache.get(key)
+    if chain is None:
+        chain = builder()
+        chain_cache.set(key, chain)
+
+    return chain
+
+
+def drop_model_chains(model_id: str):
+    """Drops the chains built on a model that is going away."""
+    for key in chain_cache.keys():
+        if model_id in key:
+            chain_cache.pop(key)
+
+
+def clear_chain_cache():
+    chain_cache.clear()
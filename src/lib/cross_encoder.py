@@ -0,0 +1,117 @@
+import asyncio
+import hashlib
+import threading
+import time
+from typing import TYPE_CHECKING, List, Optional
+from langchain_core.documents import Document
+from utils.cache import LRUCache
+from utils.logger import logger
+from utils.metrics import register_cache
+
+if TYPE_CHECKING:
+    from sentence_transformers import CrossEncoder
+
+
+class CrossEncoderReranker:
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 16,
+        cache_size: int = 4096,
+        max_length: int = 512,
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.cache = LRUCache(max_size=cache_size)
+        self.model: Optional["CrossEncoder"] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> "CrossEncoder":
+        # sentence_transformers pulls in torch, so it is only imported once a
+        # rerank (or the warm-up) actually needs the model.
+        with self._lock:
+            if self.model is None:
+                from sentence_transformers import CrossEncoder
+
+                self.model = CrossEncoder(
+                    self.model_name, device="cpu", max_length=self.max_length
+                )
+        return self.model
+
+    async def load(self):
+        await asyncio.to_thread(self._load)
+
+    def _score_batch(self, query: str, keys: List[tuple], texts: List[str]):
+        model = self._load()
+        scores = model.predict(
+            [(query, text) for text in texts], batch_size=len(texts)
+        )
+
+        # Scores are cached from the worker thread so that a batch finishing
+        # after the budget has expired still benefits the next request.
+        for key, score in zip(keys, scores):
+            self.cache.set(key, float(score))
+
+    async def rerank(
+        self, query: str, docs: List[Document], budget: float
+    ) -> List[Document]:
+        deadline = time.monotonic() + budget
+
+        keys = [
+            (query, hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest())
+            for doc in docs
+        ]
+        scores = [self.cache.get(key) for key in keys]
+        pending = [i for i, score in enumerate(scores) if score is None]
+
+        for start in range(0, len(pending), self.batch_size):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            batch = pending[start : start + self.batch_size]
+            task = asyncio.to_thread(
+                self._score_batch,
+                query,
+                [keys[i] for i in batch],
+                [docs[i].page_content for i in batch],
+            )
+
+            try:
+                await asyncio.wait_for(asyncio.shield(task), remaining)
+            except asyncio.TimeoutError:
+                break
+
+            for i in batch:
+                scores[i] = self.cache.get(keys[i])
+
+        # Docs arrive in vector-similarity order and are scored front to back,
+        # so whatever was scored in budget is reordered and the rest keeps its
+        # vector ranking behind it.
+        scored = [i for i, score in enumerate(scores) if score is not None]
+        unscored = [i for i, score in enumerate(scores) if score is None]
+
+        if unscored:
+            logger.info(
+                "Cross-encoder budget exhausted, %d/%d docs keep vector order",
+                len(unscored),
+                len(docs),
+                extra={"rate_limit": "cross_encoder_budget"},
+            )
+
+        scored.sort(key=lambda i: scores[i], reverse=True)
+        return [docs[i] for i in scored + unscored]
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+
+
+def get_cross_encoder_reranker(model_name: str) -> CrossEncoderReranker:
+    global _reranker
+
+    if _reranker is None or _reranker.model_name != model_name:
+        _reranker = CrossEncoderReranker(model_name=model_name)
+        register_cache("rerank_scores", _reranker.cache)
+
+    return _reranker
@@ -0,0 +1,347 @@
+import asyncio
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from config import (
+    get_failover_cooldown,
+    get_failover_enabled,
+    get_failover_error_threshold,
+    get_failover_fallbacks,
+    get_failover_hedge_delay,
+    get_failover_min_requests,
+    get_failover_window,
+)
+from lib.chain_cache import get_model_id, with_temperature
+from utils.logger import logger
+from utils.metrics import circuit_opened, get_llm_labels, llm_hedges
+
+
+class CircuitBreaker:
+    """
+    Opens once at least `min_requests` calls in the last `window` seconds
+    failed at `error_threshold` or more. After `cooldown` seconds one trial
+    call is let through, its outcome closing or reopening the circuit. A
+    trial cancelled because another model answered first is forgotten, and
+    one that never reports back is replaced after another `cooldown`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_threshold: float,
+        min_requests: int,
+        window: float,
+        cooldown: float,
+    ):
+        self.name = name
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.window = window
+        self.cooldown = cooldown
+        self.outcomes: "deque[Tuple[float, bool]]" = deque()
+        self.opened_at: Optional[float] = None
+        self.trial_started_at: Optional[float] = None
+
+    def available(self) -> bool:
+        if self.opened_at is None:
+            return True
+
+        now = time.monotonic()
+        return now - self.opened_at >= self.cooldown and (
+            self.trial_started_at is None
+            or now - self.trial_started_at >= self.cooldown
+        )
+
+    def start(self) -> bool:
+        """Notes a call starting; True when it is the trial of an open circuit."""
+        if self.opened_at is None:
+            return False
+
+        self.trial_started_at = time.monotonic()
+        return True
+
+    def abandon(self):
+        # A trial cancelled because another model won says nothing about
+        # this one, so the next call may try again.
+        self.trial_started_at = None
+
+    def record(self, ok: bool):
+        now = time.monotonic()
+
+        if self.opened_at is not None:
+            self.trial_started_at = None
+            if ok:
+                self.opened_at = None
+                self.outcomes.clear()
+            else:
+                self.opened_at = now
+            return
+
+        self.outcomes.append((now, ok))
+        while self.outcomes and now - self.outcomes[0][0] > self.window:
+            self.outcomes.popleft()
+
+        failures = sum(1 for _, succeeded in self.outcomes if not succeeded)
+        if (
+            len(self.outcomes) >= self.min_requests
+            and failures / len(self.outcomes) >= self.error_threshold
+        ):
+            self.opened_at = now
+            circuit_opened.labels(model=self.name).inc()
+            logger.warning(
+                "Circuit opened for %s after %d/%d failed calls",
+                self.name,
+                failures,
+                len(self.outcomes),
+            )
+
+
+breakers: Dict[Tuple[str, str, str], CircuitBreaker] = {}
+
+
+def get_breaker_key(llm: BaseChatModel) -> Tuple[str, str, str]:
+    # Copies of a model that only differ in settings such as temperature, and
+    # the wrappers around it, all call the same endpoint and share a breaker.
+    while isinstance(getattr(llm, "inner", None), BaseChatModel):
+        llm = llm.inner
+
+    labels = get_llm_labels(llm)
+    base_url = getattr(llm, "openai_api_base", None) or getattr(llm, "base_url", None)
+    return labels["provider"], labels["model"], str(base_url or "")
+
+
+def get_breaker(llm: BaseChatModel) -> CircuitBreaker:
+    key = get_breaker_key(llm)
+    if key not in breakers:
+        breakers[key] = CircuitBreaker(
+            get_llm_labels(llm)["model"],
+            error_threshold=get_failover_error_threshold(),
+            min_requests=get_failover_min_requests(),
+            window=get_failover_window(),
+            cooldown=get_failover_cooldown(),
+        )
+    return breakers[key]
+
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Calls `models` in order of preference. When the current model has not
+    produced its first token (or its result) within `hedge_delay` seconds,
+    or fails, the next one is started alongside it. The first to respond
+    wins and the others are cancelled. Models whose circuit is open are
+    skipped while any other is available.
+    """
+
+    models: List[BaseChatModel]
+    hedge_delay: float
+
+    @property
+    def _llm_type(self) -> str:
+        return f"hedged-{self.models[0]._llm_type}"
+
+    @property
+    def inner(self) -> BaseChatModel:
+        # Caches and metrics identify the composite by its primary model.
+        return self.models[0]
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return getattr(self.models[0], "temperature", None)
+
+    def with_temperature(self, temperature: float) -> "HedgedChatModel":
+        return self.model_copy(
+            update={
+                "models": [
+                    with_temperature(model, temperature) for model in self.models
+                ]
+            }
+        )
+
+    def _get_candidates(self) -> List[BaseChatModel]:
+        candidates = [model for model in self.models if get_breaker(model).available()]
+        # With every circuit open, trying anyway beats failing outright.
+        return candidates or self.models
+
+    def _get_config(self, run_manager: Any) -> Dict[str, Any]:
+        return {"callbacks": run_manager.get_child()} if run_manager else {}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self.models[0].invoke(
+            messages, config=self._get_config(run_manager), stop=stop, **kwargs
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _race(
+        self,
+        start_attempt: Callable[[BaseChatModel], Awaitable[Any]],
+        discard: Optional[Callable[[Any], Awaitable[None]]] = None,
+    ) -> Any:
+        """
+        Starts `start_attempt(model)` for the preferred candidate and hedges
+        with the next one whenever `hedge_delay` passes or an attempt fails.
+        Returns the result of the first attempt to succeed; results of any
+        others that succeeded at the same time are passed to `discard`.
+        """
+        candidates = self._get_candidates()
+        pending: Dict[asyncio.Task, BaseChatModel] = {}
+        trials: Set[asyncio.Task] = set()
+        last_error: Optional[BaseException] = None
+
+        def start_next(reason: Optional[str]):
+            model = candidates.pop(0)
+            if reason:
+                llm_hedges.labels(reason=reason, **get_llm_labels(model)).inc()
+            task = asyncio.create_task(start_attempt(model))
+            pending[task] = model
+            if get_breaker(model).start():
+                trials.add(task)
+
+        start_next(None)
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.hedge_delay if candidates else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+
+                if not done:
+                    start_next("slow")
+                    continue
+
+                # Every attempt that finished is accounted for, including
+                # those that finished together with the winner.
+                winner = None
+                for task in done:
+                    model = pending.pop(task)
+                    if task.exception() is None:
+                        get_breaker(model).record(True)
+                        if winner is None:
+                            winner = task
+                        elif discard:
+                            await discard(task.result())
+                        continue
+
+                    last_error = task.exception()
+                    get_breaker(model).record(False)
+                    logger.warning(
+                        "Chat model %s failed, failing over: %s",
+                        get_llm_labels(model)["model"],
+                        last_error,
+                    )
+
+                if winner is not None:
+                    return winner.result()
+
+                if candidates:
+                    start_next("error")
+        finally:
+            for task in pending:
+                task.cancel()
+            results = await asyncio.gather(*pending, return_exceptions=True)
+
+            for (task, model), result in zip(pending.items(), results):
+                if isinstance(result, asyncio.CancelledError):
+                    if task in trials:
+                        get_breaker(model).abandon()
+                elif isinstance(result, BaseException):
+                    get_breaker(model).record(False)
+                else:
+                    get_breaker(model).record(True)
+                    if discard:
+                        await discard(result)
+
+        raise last_error
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        config = self._get_config(run_manager)
+
+        message = await self._race(
+            lambda model: model.ainvoke(messages, config=config, stop=stop, **kwargs)
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        config = self._get_config(run_manager)
+
+        async def first_chunk(model: BaseChatModel):
+            stream = model.astream(messages, config=config, stop=stop, **kwargs)
+            try:
+                return stream, await stream.__anext__()
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        # Only time to first token is hedged: once a model has started
+        # answering, the rest of its stream is used as is.
+        stream, chunk = await self._race(
+            first_chunk, discard=lambda result: result[0].aclose()
+        )
+        try:
+            yield ChatGenerationChunk(message=chunk)
+            async for chunk in stream:
+                yield ChatGenerationChunk(message=chunk)
+        finally:
+            await stream.aclose()
+
+
+def with_failover(
+    llm: BaseChatModel, chat_model_providers: Dict[str, Dict[str, Any]]
+) -> BaseChatModel:
+    """
+    Wraps `llm` with the fallbacks from [FAILOVER] when it is enabled. The
+    fallbacks are "provider/model" keys looked up in the provider registry;
+    unavailable ones and the requested model itself are skipped.
+    """
+    if not get_failover_enabled():
+        return llm
+
+    primary_id = get_model_id(llm)
+    fallbacks = []
+    for key in get_failover_fallbacks():
+        provider, _, model = key.partition("/")
+        entry = chat_model_providers.get(provider, {}).get(model)
+        if entry and get_model_id(entry["model"]) != primary_id:
+            fallbacks.append(entry["model"])
+
+    if not fallbacks:
+        return llm
+
+    return HedgedChatModel(
+        models=[llm, *fallbacks], hedge_delay=get_failover_hedge_delay()
+    )
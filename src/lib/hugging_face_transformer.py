@@ -1,11 +1,9 @@
-import numpy as np
-from transformers import AutoTokenizer, AutoModel
-import torch
-from sentence_transformers import SentenceTransformer
-from typing import List, Optional
+import threading
+from langchain_core.embeddings import Embeddings
+from typing import Any, List, Optional
 
 
-class HuggingFaceTransformersEmbeddings:
+class HuggingFaceTransformersEmbeddings(Embeddings):
     def __init__(
         self,
         model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
@@ -16,14 +14,27 @@ class HuggingFaceTransformersEmbeddings:
         self.batch_size = batch_size
         self.strip_new_lines = strip_new_lines
 
-        # Load tokenizer and model
-        self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModel.from_pretrained(self.model_name)
+        # torch and the weights are loaded on the first embedding call, so
+        # listing the local provider does not cost seconds at startup.
+        self.tokenizer: Optional[Any] = None
+        self.model: Optional[Any] = None
+        self._lock = threading.Lock()
 
-        # Set to evaluation mode
-        self.model.eval()
+    def _load(self):
+        with self._lock:
+            if self.model is None:
+                from transformers import AutoTokenizer, AutoModel
+
+                self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModel.from_pretrained(self.model_name)
+
+                # Set to evaluation mode
+                model.eval()
+                self.model = model
 
     def _mean_pooling(self, model_output, attention_mask):
+        import torch
+
         token_embeddings = model_output[0]
         input_mask_expanded = (
             attention_mask.unsqueeze(-1).expand(token_embeddings.size()).float()
@@ -33,6 +44,10 @@ class HuggingFaceTransformersEmbeddings:
         )
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        import torch
+
+        self._load()
+
         if self.strip_new_lines:
             texts = [text.replace("\n", " ") for text in texts]
 
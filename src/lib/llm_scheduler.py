@@ -0,0 +1,469 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from config import get_rate_limits
+from lib.chain_cache import with_temperature
+from utils.logger import logger
+from utils.metrics import llm_queue_wait, llm_retries, register_queue
+
+MAX_RETRIES = 3
+BASE_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+# Reserved per request on top of the prompt until the real usage is known.
+COMPLETION_TOKENS_ESTIMATE = 512
+CHARS_PER_TOKEN = 4
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "ServiceUnavailable"}
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    SUGGESTIONS = 1
+    SUMMARIES = 2
+
+
+request_priority: ContextVar[Priority] = ContextVar(
+    "request_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def llm_priority(priority: Priority) -> Iterator[None]:
+    """Runs the LLM calls made inside the block at `priority`."""
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class PrioritySemaphore:
+    """An asyncio semaphore handed to waiters in (priority, arrival) order."""
+
+    def __init__(self, value: int = 1):
+        self.value = value
+        self.waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, priority: int):
+        if self.value > 0 and not self.waiters:
+            self.value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been handed over just as we were cancelled.
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        while self.waiters:
+            _, _, future = heapq.heappop(self.waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+
+        self.value += 1
+
+
+class TokenBucket:
+    """Refills `per_minute` units a minute. Reservations may run it negative."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Takes `amount` and returns how long to wait before using it."""
+        now = time.monotonic()
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+    def adjust(self, amount: float):
+        self._refill(time.monotonic())
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class Lane:
+    """
+    Limits for one provider or one model. Concurrency slots go to waiters in
+    priority order. Admitted requests then reserve their request and token
+    budget at once and sleep until the reservation, and any pause after a
+    429, has passed, without holding up the requests behind them, so bursts
+    are paced to the quota.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.name = name
+        self.slots = PrioritySemaphore(concurrency) if concurrency else None
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+        self.pacing = 0
+
+    def depth(self) -> int:
+        return self.pacing + (len(self.slots.waiters) if self.slots else 0)
+
+    async def acquire(self, priority: Priority, tokens: int):
+        if self.slots:
+            await self.slots.acquire(priority)
+
+        self.pacing += 1
+        try:
+            delay = max(
+                self.requests.reserve(1) if self.requests else 0.0,
+                self.tokens.reserve(tokens) if self.tokens else 0.0,
+            )
+            ready_at = time.monotonic() + delay
+
+            # A 429 seen while waiting pushes the start back further.
+            while (wait := max(ready_at, self.paused_until) - time.monotonic()) > 0:
+                await asyncio.sleep(wait)
+        except BaseException:
+            # Cancelled before it started, so give the reservation back.
+            if self.requests:
+                self.requests.adjust(-1)
+            if self.tokens:
+                self.tokens.adjust(-min(tokens, self.tokens.capacity))
+            if self.slots:
+                self.slots.release()
+            raise
+        finally:
+            self.pacing -= 1
+
+    def release(self, token_correction: int = 0):
+        if self.tokens and token_correction:
+            self.tokens.adjust(token_correction)
+        if self.slots:
+            self.slots.release()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class Lease:
+    def __init__(self, lanes: List[Lane], tokens: int):
+        self.lanes = lanes
+        self.reserved = tokens
+        self.used: Optional[int] = None
+
+    def record_usage(self, total_tokens: Optional[int]):
+        # Streams may report usage over several chunks.
+        if total_tokens is not None:
+            self.used = (self.used or 0) + total_tokens
+
+    def refund(self):
+        # A failed attempt is taken not to have used what it reserved.
+        if self.used is None:
+            self.used = 0
+
+    def release(self):
+        # Charges, or refunds, the difference to the estimate reserved.
+        correction = self.used - self.reserved if self.used is not None else 0
+        for lane in reversed(self.lanes):
+            lane.release(correction)
+
+    def pause(self, seconds: float):
+        for lane in self.lanes:
+            lane.pause(seconds)
+
+
+class LLMScheduler:
+    """
+    Coordinates calls to the provider models. Limits come from the
+    [RATE_LIMITS] section of config.toml, per provider and per model:
+
+        [RATE_LIMITS.groq]
+        CONCURRENCY = 4
+        REQUESTS_PER_MINUTE = 30
+        TOKENS_PER_MINUTE = 6000
+
+        [RATE_LIMITS.groq.MODELS."llama-3.2-3b-preview"]
+        CONCURRENCY = 2
+
+    A request holds its model lane and then its provider lane, always in
+    that order.
+    """
+
+    def __init__(self):
+        self.lanes: Dict[str, Optional[Lane]] = {}
+
+    def get_depth(self, name: str) -> int:
+        lane = self.lanes.get(name)
+        return lane.depth() if lane else 0
+
+    def clear(self):
+        """
+        Drops the lanes so that they are rebuilt from the current limits.
+        Requests holding the old lanes release them as usual.
+        """
+        self.lanes.clear()
+
+    def _get_lane(self, name: str, limits: Dict[str, Any]) -> Optional[Lane]:
+        if name not in self.lanes:
+            lane = None
+            if any(
+                limits.get(key)
+                for key in ("CONCURRENCY", "REQUESTS_PER_MINUTE", "TOKENS_PER_MINUTE")
+            ):
+                lane = Lane(
+                    name,
+                    concurrency=limits.get("CONCURRENCY"),
+                    requests_per_minute=limits.get("REQUESTS_PER_MINUTE"),
+                    tokens_per_minute=limits.get("TOKENS_PER_MINUTE"),
+                )
+                register_queue(f"llm:{name}", lambda: self.get_depth(name))
+            self.lanes[name] = lane
+
+        return self.lanes[name]
+
+    def get_lanes(self, provider: str, model: str) -> List[Lane]:
+        provider_limits = get_rate_limits().get(provider, {})
+        model_limits = provider_limits.get("MODELS", {}).get(model, {})
+
+        lanes = [
+            self._get_lane(f"{provider}/{model}", model_limits),
+            self._get_lane(provider, provider_limits),
+        ]
+        return [lane for lane in lanes if lane is not None]
+
+    @asynccontextmanager
+    async def lease(self, provider: str, model: str, tokens: int):
+        priority = request_priority.get()
+        started = time.monotonic()
+
+        acquired: List[Lane] = []
+        try:
+            for lane in self.get_lanes(provider, model):
+                await lane.acquire(priority, tokens)
+                acquired.append(lane)
+        except BaseException:
+            for lane in reversed(acquired):
+                lane.release()
+            raise
+
+        llm_queue_wait.labels(
+            provider=provider, model=model, priority=priority.name.lower()
+        ).observe(time.monotonic() - started)
+
+        lease = Lease(acquired, tokens)
+        try:
+            yield lease
+        finally:
+            lease.release()
+
+    def get_retry_delay(
+        self, error: Exception, attempt: int, provider: str, model: str, lease: Lease
+    ) -> Optional[float]:
+        """Returns how long to back off before retrying, or None to give up."""
+        status = get_status_code(error)
+        if attempt >= MAX_RETRIES or not (
+            status in RETRYABLE_STATUSES or type(error).__name__ in RETRYABLE_ERRORS
+        ):
+            return None
+
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            # A little jitter keeps the waiting requests from retrying at once.
+            delay = retry_after * random.uniform(1.0, 1.2)
+        else:
+            delay = random.uniform(0, min(MAX_BACKOFF, BASE_BACKOFF * 2**attempt))
+
+        if status == 429:
+            # Everyone else on these lanes holds off too, instead of piling on.
+            lease.pause(delay)
+
+        llm_retries.labels(provider=provider, model=model, status=str(status)).inc()
+        logger.warning(
+            "Retrying %s/%s in %.2fs after %s",
+            provider,
+            model,
+            delay,
+            type(error).__name__,
+            extra={"rate_limit": f"llm_retry:{provider}"},
+        )
+        return delay
+
+
+def get_status_code(error: Exception) -> Optional[int]:
+    for source in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def get_retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        # HTTP-date values are rare enough to fall back to backoff.
+        pass
+
+    return None
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    chars = sum(len(str(message.content)) for message in messages)
+    return chars // CHARS_PER_TOKEN + COMPLETION_TOKENS_ESTIMATE
+
+
+def get_total_tokens(message: Any) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+llm_scheduler = LLMScheduler()
+
+
+class ScheduledChatModel(BaseChatModel):
+    """
+    Wraps a provider model so its calls go through the scheduler: queued by
+    priority within the provider's limits and retried on rate limits. Only
+    the async paths are scheduled; sync calls go straight to the model.
+    """
+
+    inner: BaseChatModel
+    provider_name: str
+    model_key: str
+
+    @property
+    def _llm_type(self) -> str:
+        return f"scheduled-{self.inner._llm_type}"
+
+    @property
+    def temperature(self) -> Optional[float]:
+        return getattr(self.inner, "temperature", None)
+
+    def with_temperature(self, temperature: float) -> "ScheduledChatModel":
+        return self.model_copy(
+            update={"inner": with_temperature(self.inner, temperature)}
+        )
+
+    def _get_config(self, run_manager: Any) -> Dict[str, Any]:
+        return {"callbacks": run_manager.get_child()} if run_manager else {}
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self.inner.invoke(
+            messages, config=self._get_config(run_manager), stop=stop, **kwargs
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        for attempt in itertools.count():
+            async with llm_scheduler.lease(
+                self.provider_name, self.model_key, estimate_tokens(messages)
+            ) as lease:
+                try:
+                    message = await self.inner.ainvoke(
+                        messages,
+                        config=self._get_config(run_manager),
+                        stop=stop,
+                        **kwargs,
+                    )
+                    lease.record_usage(get_total_tokens(message))
+                    return ChatResult(generations=[ChatGeneration(message=message)])
+                except Exception as e:
+                    lease.refund()
+                    delay = llm_scheduler.get_retry_delay(
+                        e, attempt, self.provider_name, self.model_key, lease
+                    )
+                    if delay is None:
+                        raise
+
+            await asyncio.sleep(delay)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for attempt in itertools.count():
+            async with llm_scheduler.lease(
+                self.provider_name, self.model_key, estimate_tokens(messages)
+            ) as lease:
+                streamed = False
+                try:
+                    async for chunk in self.inner.astream(
+                        messages,
+                        config=self._get_config(run_manager),
+                        stop=stop,
+                        **kwargs,
+                    ):
+                        streamed = True
+                        lease.record_usage(get_total_tokens(chunk))
+                        yield ChatGenerationChunk(message=chunk)
+                    return
+                except Exception as e:
+                    # Once tokens have reached the client a retry would
+                    # repeat them, so only failures before that are retried.
+                    if not streamed:
+                        lease.refund()
+                    delay = (
+                        None
+                        if streamed
+                        else llm_scheduler.get_retry_delay(
+                            e, attempt, self.provider_name, self.model_key, lease
+                        )
+                    )
+                    if delay is None:
+                        raise
+
+            await asyncio.sleep(delay)
+
+
+def schedule(provider: str, model_key: str, llm: BaseChatModel) -> BaseChatModel:
+    return ScheduledChatModel(inner=llm, provider_name=provider, model_key=model_key)
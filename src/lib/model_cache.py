@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Tuple
+import httpx
+from langchain_openai import ChatOpenAI
+from lib.chain_cache import drop_model_chains, get_model_id
+from utils.logger import logger
+from utils.metrics import register_cache
+
+# Requests that picked up a model just before it was evicted may still be
+# streaming from it, so its HTTP clients are only closed after this long.
+CLOSE_GRACE = 300.0
+
+Clients = Tuple[httpx.Client, httpx.AsyncClient]
+
+
+class ChatModelCache:
+    """
+    Keeps up to `max_size` ad-hoc chat models, such as custom_openai ones,
+    so that requests reuse their pooled connections. A model unused for
+    `idle_ttl` seconds, or pushed out by newer ones, is dropped together with
+    the chains built on it, and its HTTP clients are closed.
+    """
+
+    def __init__(self, max_size: int = 64, idle_ttl: float = 600.0):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._models: "OrderedDict[Hashable, Tuple[ChatOpenAI, Clients, float]]" = (
+            OrderedDict()
+        )
+        self._closing: Dict[asyncio.Task, Clients] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _evict(self, key: Hashable):
+        model, clients, _ = self._models.pop(key)
+        drop_model_chains(get_model_id(model))
+
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_later(clients))
+        except RuntimeError:
+            # No loop to wait on, so there can be no request still using it.
+            clients[0].close()
+            return
+
+        self._closing[task] = clients
+        task.add_done_callback(lambda task: self._closing.pop(task, None))
+
+    def _evict_stale(self, now: float):
+        # Entries are kept in order of last use, so the stale ones are first.
+        while self._models:
+            key, (_, _, last_used) = next(iter(self._models.items()))
+            if now - last_used < self.idle_ttl and len(self._models) <= self.max_size:
+                break
+            self._evict(key)
+
+    async def _close(self, clients: Clients):
+        client, async_client = clients
+        try:
+            client.close()
+            await async_client.aclose()
+        except Exception as e:
+            logger.error(f"Error closing chat model clients: {e}")
+
+    async def _close_later(self, clients: Clients):
+        await asyncio.sleep(CLOSE_GRACE)
+        await self._close(clients)
+
+    def get_custom_openai(
+        self, model: str, api_key: str, base_url: str, temperature: float = 0.7
+    ) -> ChatOpenAI:
+        key = (
+            base_url.rstrip("/"),
+            hashlib.sha256(api_key.encode("utf-8")).hexdigest(),
+            model,
+            temperature,
+        )
+        now = time.monotonic()
+        self._evict_stale(now)
+
+        entry = self._models.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._models[key] = (entry[0], entry[1], now)
+            self._models.move_to_end(key)
+            # Callers get their own shallow copy, which shares the cached
+            # HTTP clients but not the settings a caller might change.
+            return entry[0].model_copy()
+
+        self.misses += 1
+
+        # Owning the HTTP clients is what lets eviction close them without
+        # touching connection pools shared with other models.
+        clients = (httpx.Client(), httpx.AsyncClient())
+        llm = ChatOpenAI(
+            model=model,
+            api_key=api_key,
+            temperature=temperature,
+            base_url=base_url,
+            http_client=clients[0],
+            http_async_client=clients[1],
+        )
+
+        self._models[key] = (llm, clients, now)
+        self._evict_stale(now)
+
+        return llm.model_copy()
+
+    async def aclose(self):
+        pending = list(self._closing.items())
+        for task, _ in pending:
+            task.cancel()
+
+        live = [clients for _, clients, _ in self._models.values()]
+        self._models.clear()
+
+        for clients in live + [clients for _, clients in pending]:
+            await self._close(clients)
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+chat_model_cache = ChatModelCache()
+register_cache("chat_models", chat_model_cache)
+
+
+def get_custom_openai_chat_model(model: str, api_key: str, base_url: str) -> ChatOpenAI:
+    return chat_model_cache.get_custom_openai(model, api_key, base_url)
@@ -0,0 +1,160 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+import httpx
+from config import (
+    get_keep_alive,
+    get_ollama_api_endpoint,
+    get_ollama_catalog_ttl,
+    get_ollama_hot_models,
+)
+from utils.cache import LRUCache
+from utils.logger import logger
+from utils.metrics import register_cache, span
+
+REQUEST_TIMEOUT = 10.0
+# Loading a model into memory can take far longer than listing one.
+PRELOAD_TIMEOUT = 300.0
+
+
+class OllamaCatalog:
+    """
+    Async view of an Ollama server. `/api/tags` and `/api/ps` are cached for
+    `ttl` seconds per endpoint, and concurrent refreshes share one request.
+    Configured hot models are preloaded with `keep_alive` and reloaded by a
+    background loop whenever Ollama has evicted them.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self.tags = LRUCache(max_size=8, ttl=ttl)
+        self.running = LRUCache(max_size=8, ttl=ttl)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        return self._client
+
+    async def _get_cached(
+        self, cache: LRUCache, endpoint: str, path: str, stage: str
+    ) -> Any:
+        models = cache.get(endpoint)
+        if models is not None:
+            return models
+
+        lock = self._locks.setdefault(f"{endpoint}{path}", asyncio.Lock())
+        async with lock:
+            # Whoever held the lock may have refreshed it already.
+            models = cache.get(endpoint)
+            if models is not None:
+                return models
+
+            with span(stage):
+                response = await self.client.get(f"{endpoint}{path}")
+                response.raise_for_status()
+
+            models = response.json().get("models", [])
+            cache.set(endpoint, models)
+            return models
+
+    async def list_models(self) -> List[Dict[str, Any]]:
+        endpoint = get_ollama_api_endpoint()
+        if not endpoint:
+            return []
+
+        return await self._get_cached(self.tags, endpoint, "/api/tags", "ollama_tags")
+
+    async def get_resident_models(self) -> Set[str]:
+        endpoint = get_ollama_api_endpoint()
+        if not endpoint:
+            return set()
+
+        try:
+            models = await self._get_cached(
+                self.running, endpoint, "/api/ps", "ollama_ps"
+            )
+        except Exception as e:
+            # Older servers have no /api/ps, nothing is known to be warm then.
+            logger.debug(
+                "Could not list resident Ollama models: %s",
+                e,
+                extra={"rate_limit": "ollama_ps"},
+            )
+            self.running.set(endpoint, [])
+            return set()
+
+        return {model["model"] for model in models}
+
+    async def list_models_warm_first(self) -> List[Dict[str, Any]]:
+        """
+        Routes callers that take the provider's first model as the default
+        toward models that are already loaded, avoiding a cold load.
+        """
+        models, resident = await asyncio.gather(
+            self.list_models(), self.get_resident_models()
+        )
+        return sorted(models, key=lambda model: model["model"] not in resident)
+
+    async def preload(self, model: str, keep_alive: Optional[str] = None):
+        endpoint = get_ollama_api_endpoint()
+        if not endpoint:
+            return
+
+        # A generate request without a prompt only loads the model.
+        with span("ollama_preload"):
+            response = await self.client.post(
+                f"{endpoint}/api/generate",
+                json={"model": model, "keep_alive": keep_alive or get_keep_alive()},
+                timeout=PRELOAD_TIMEOUT,
+            )
+            response.raise_for_status()
+
+        self.running.pop(endpoint)
+        logger.info("Preloaded Ollama model %s", model)
+
+    async def preload_hot_models(self):
+        hot_models = get_ollama_hot_models()
+        if not hot_models:
+            return
+
+        resident = await self.get_resident_models()
+        for model in hot_models:
+            if model in resident:
+                continue
+            try:
+                await self.preload(model)
+            except Exception as e:
+                logger.error(f"Error preloading Ollama model {model}: {e}")
+
+    async def _keep_warm(self):
+        while True:
+            await self.preload_hot_models()
+            await asyncio.sleep(self.ttl)
+
+    def start(self):
+        if self._task is None and get_ollama_hot_models():
+            self._task = asyncio.create_task(self._keep_warm())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def clear(self):
+        self.tags.clear()
+        self.running.clear()
+
+
+ollama_catalog = OllamaCatalog(ttl=get_ollama_catalog_ttl())
+register_cache("ollama_tags", ollama_catalog.tags)
@@ -3,6 +3,8 @@ import re
 from typing import Optional, List
 from pydantic import Field
 
+list_marker_regex = re.compile(r"^\s*(-|\*|\d+\.\s|\d+\)\s|\u2022)\s*")
+
 
 class LineOutputParser(BaseOutputParser):
     key: str = Field(default="questions")
@@ -16,8 +18,6 @@ class LineOutputParser(BaseOutputParser):
         return ["langchain", "output_parsers", "line_output_parser"]
 
     async def parse(self, text: str) -> str:
-        regex = r"^\s*(-|\*|\d+\.\s|\d+\)\s|\u2022)\s*"
-
         start_key_index = text.find(f"<{self.key}>")
         end_key_index = text.find(f"</{self.key}>")
 
@@ -31,7 +31,7 @@ class LineOutputParser(BaseOutputParser):
 
         line = text[questions_start_index:questions_end_index].strip()
 
-        line = re.sub(regex, "", line)
+        line = list_marker_regex.sub("", line)
 
         return line
 
@@ -3,6 +3,8 @@ import re
 from typing import List, Optional
 from pydantic import Field
 
+list_marker_regex = re.compile(r"^(\s*(-|\*|\d+\.\s|\d+\)\s|\u2022)\s*)+")
+
 
 class LineListOutputParser(BaseOutputParser[List[str]]):
     key: str = Field(default="questions")
@@ -16,8 +18,6 @@ class LineListOutputParser(BaseOutputParser[List[str]]):
         return ["langchain", "output_parsers", "line_list_output_parser"]
 
     def parse(self, text: str) -> List[str]:
-        regex = r"^(\s*(-|\*|\d+\.\s|\d+\)\s|\u2022)\s*)+"
-
         start_tag = f"<{self.key}>"
         end_tag = f"</{self.key}>"
 
@@ -42,7 +42,7 @@ class LineListOutputParser(BaseOutputParser[List[str]]):
         lines = content.split("\n")
 
         parsed_lines = [
-            re.sub(regex, "", line).strip() for line in lines if line.strip()
+            list_marker_regex.sub("", line).strip() for line in lines if line.strip()
         ]
 
         return parsed_lines
@@ -0,0 +1,87 @@
+import re
+from typing import Dict, Optional, Sequence, Tuple
+
+start_tag_regex = re.compile(r"<(\w+)>")
+
+
+class TagStreamParser:
+    """
+    Accumulates streamed LLM output and tells when the tagged blocks a
+    caller is waiting for have closed, so the stream can be abandoned before
+    the model finishes any trailing text. The accumulated text is parsed with
+    the regular line parsers afterwards.
+
+    Each chunk is scanned once: blocks are recorded as they close, and only
+    the text after the last complete tag is looked at again.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.blocks: Dict[str, str] = {}
+        # The block whose end tag is awaited, and where its content starts.
+        self.open_block: Optional[Tuple[str, int]] = None
+        self.last_end = 0
+        self.offset = 0
+
+    def feed(self, chunk: str) -> str:
+        self.text += chunk
+        self._scan()
+        return self.text
+
+    def _scan(self):
+        while True:
+            if self.open_block is not None:
+                key, content_start = self.open_block
+                end_tag = f"</{key}>"
+                end_index = self.text.find(end_tag, self.offset)
+                if end_index == -1:
+                    # The end tag may be split across chunks.
+                    self.offset = max(
+                        content_start, len(self.text) - len(end_tag) + 1
+                    )
+                    return
+
+                self.blocks.setdefault(
+                    key, self.text[content_start:end_index].strip()
+                )
+                self.open_block = None
+                self.last_end = self.offset = end_index + len(end_tag)
+                continue
+
+            match = start_tag_regex.search(self.text, self.offset)
+            if match is None:
+                # Keep a start tag that has not fully arrived yet in view.
+                partial = self.text.rfind("<", self.offset)
+                self.offset = partial if partial != -1 else len(self.text)
+                return
+
+            self.open_block = (match.group(1), match.end())
+            self.offset = match.end()
+
+    def block(self, key: str) -> Optional[str]:
+        return self.blocks.get(key)
+
+    def is_complete(self, key: str, optional_keys: Sequence[str] = ()) -> bool:
+        """
+        True once the `key` block has closed and none of `optional_keys` can
+        still follow: each is either closed already or the text after the
+        last closed block is something other than its opening tag.
+        """
+        if key not in self.blocks:
+            return False
+
+        pending = [k for k in optional_keys if k not in self.blocks]
+        if not pending:
+            return True
+
+        if self.open_block is not None and self.open_block[0] in pending:
+            return False
+
+        rest = self.text[self.last_end :].lstrip()
+
+        for k in pending:
+            start_tag = f"<{k}>"
+            if start_tag in rest or start_tag.startswith(rest):
+                return False
+
+        return True
@@ -45,7 +45,10 @@ async def load_anthropic_chat_models() -> dict:
             },
         }
 
-        logger.info("Anthropic chat models loaded successfully.")
+        logger.debug(
+            "Anthropic chat models loaded successfully.",
+            extra={"rate_limit": "providers:anthropic_chat"},
+        )
         return chat_models
 
     except Exception as e:
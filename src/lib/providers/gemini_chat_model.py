@@ -31,7 +31,10 @@ async def load_gemini_chat_models() -> dict:
             },
         }
 
-        logger.info("Gemini chat models loaded successfully.")
+        logger.debug(
+            "Gemini chat models loaded successfully.",
+            extra={"rate_limit": "providers:gemini_chat"},
+        )
         return chat_models
     except Exception as e:
         logger.error(f"Error loading Gemini chat models: {e}")
@@ -54,7 +57,10 @@ async def load_gemini_embeddings_models() -> dict:
             }
         }
 
-        logger.info("Gemini embeddings models loaded successfully.")
+        logger.debug(
+            "Gemini embeddings models loaded successfully.",
+            extra={"rate_limit": "providers:gemini_embeddings"},
+        )
         return embedding_models
     except Exception as e:
         logger.error(f"Error loading Gemini embeddings model: {e}")
@@ -103,7 +103,10 @@ async def load_groq_chat_models() -> dict:
             },
         }
 
-        logger.info("Groq chat models loaded successfully.")
+        logger.debug(
+            "Groq chat models loaded successfully.",
+            extra={"rate_limit": "providers:groq_chat"},
+        )
         return chat_models
     except Exception as err:
         logger.error(f"Error loading Groq models: {err}")
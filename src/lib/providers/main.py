@@ -1,34 +1,47 @@
 import asyncio
+import importlib
+from typing import Awaitable, Callable
+from lib.llm_scheduler import schedule
+
+
+def lazy_loader(module_name: str, function_name: str) -> Callable[[], Awaitable[dict]]:
+    """
+    Defers importing a provider module, and with it its LangChain integration,
+    until the provider's models are first listed.
+    """
+
+    async def load() -> dict:
+        # A cold import of an integration can take seconds; the import lock
+        # makes this safe to run off the event loop.
+        module = await asyncio.to_thread(importlib.import_module, module_name)
+        return await getattr(module, function_name)()
+
+    return load
 
-from lib.providers.groq_chat_model import load_groq_chat_models
-from lib.providers.ollama_chat_model import (
-    load_ollama_chat_models,
-    load_ollama_embeddings_models,
-)
-from lib.providers.openai_chat_model import (
-    load_openai_chat_models,
-    load_openai_embeddings_models,
-)
-from lib.providers.anthropic_chat_model import load_anthropic_chat_models
-from lib.providers.transformers_embeddings import load_transformers_embeddings_models
-from lib.providers.gemini_chat_model import (
-    load_gemini_chat_models,
-    load_gemini_embeddings_models,
-)
 
 chat_model_providers = {
-    "openai": load_openai_chat_models,
-    "groq": load_groq_chat_models,
-    "ollama": load_ollama_chat_models,
-    "anthropic": load_anthropic_chat_models,
-    "gemini": load_gemini_chat_models,
+    "openai": lazy_loader("lib.providers.openai_chat_model", "load_openai_chat_models"),
+    "groq": lazy_loader("lib.providers.groq_chat_model", "load_groq_chat_models"),
+    "ollama": lazy_loader("lib.providers.ollama_chat_model", "load_ollama_chat_models"),
+    "anthropic": lazy_loader(
+        "lib.providers.anthropic_chat_model", "load_anthropic_chat_models"
+    ),
+    "gemini": lazy_loader("lib.providers.gemini_chat_model", "load_gemini_chat_models"),
 }
 
 embedding_model_providers = {
-    "openai": load_openai_embeddings_models,
-    "local": load_transformers_embeddings_models,
-    "ollama": load_ollama_embeddings_models,
-    "gemini": load_gemini_embeddings_models,
+    "openai": lazy_loader(
+        "lib.providers.openai_chat_model", "load_openai_embeddings_models"
+    ),
+    "local": lazy_loader(
+        "lib.providers.transformers_embeddings", "load_transformers_embeddings_models"
+    ),
+    "ollama": lazy_loader(
+        "lib.providers.ollama_chat_model", "load_ollama_embeddings_models"
+    ),
+    "gemini": lazy_loader(
+        "lib.providers.gemini_chat_model", "load_gemini_embeddings_models"
+    ),
 }
 
 
@@ -37,6 +50,9 @@ async def get_available_chat_model_providers():
     for provider, load_func in chat_model_providers.items():
         provider_models = await load_func()
         if provider_models:
+            # Calls go through the scheduler to stay within provider quotas.
+            for model, entry in provider_models.items():
+                entry["model"] = schedule(provider, model, entry["model"])
             models[provider] = provider_models
 
     models["custom_openai"] = {}
@@ -1,6 +1,6 @@
-import requests
 from config import get_ollama_api_endpoint, get_keep_alive
 from utils.logger import logger
+from lib.ollama_catalog import ollama_catalog
 from langchain_ollama import ChatOllama, OllamaEmbeddings
 
 
@@ -12,12 +12,9 @@ async def load_ollama_chat_models() -> dict:
         return {}
 
     try:
-        response = requests.get(
-            f"{ollama_endpoint}/api/tags", headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-
-        ollama_models = response.json().get("models", [])
+        # Resident models come first, so requests that fall back to the
+        # provider's first model do not wait for a cold load.
+        ollama_models = await ollama_catalog.list_models_warm_first()
 
         chat_models = {}
         for model in ollama_models:
@@ -31,7 +28,10 @@ async def load_ollama_chat_models() -> dict:
                 ),
             }
 
-        logger.info("Ollama chat models loaded successfully.")
+        logger.debug(
+            "Ollama chat models loaded successfully.",
+            extra={"rate_limit": "providers:ollama_chat"},
+        )
         return chat_models
 
     except Exception as e:
@@ -46,12 +46,7 @@ async def load_ollama_embeddings_models() -> dict:
         return {}
 
     try:
-        response = requests.get(
-            f"{ollama_endpoint}/api/tags", headers={"Content-Type": "application/json"}
-        )
-        response.raise_for_status()
-
-        ollama_models = response.json().get("models", [])
+        ollama_models = await ollama_catalog.list_models_warm_first()
 
         embeddings_models = {}
         for model in ollama_models:
@@ -62,7 +57,10 @@ async def load_ollama_embeddings_models() -> dict:
                 ),
             }
 
-        logger.info("Ollama embeddings models loaded successfully.")
+        logger.debug(
+            "Ollama embeddings models loaded successfully.",
+            extra={"rate_limit": "providers:ollama_embeddings"},
+        )
         return embeddings_models
 
     except Exception as e:
@@ -43,7 +43,10 @@ async def load_openai_chat_models() -> dict:
             },
         }
 
-        logger.info("OpenAI chat models loaded successfully.")
+        logger.debug(
+            "OpenAI chat models loaded successfully.",
+            extra={"rate_limit": "providers:openai_chat"},
+        )
         return chat_models
 
     except Exception as e:
@@ -75,7 +78,10 @@ async def load_openai_embeddings_models() -> dict:
             },
         }
 
-        logger.info("OpenAI embeddings models loaded successfully.")
+        logger.debug(
+            "OpenAI embeddings models loaded successfully.",
+            extra={"rate_limit": "providers:openai_embeddings"},
+        )
         return embedding_models
     except Exception as e:
         logger.error(f"Error loading OpenAI embeddings models: {e}")
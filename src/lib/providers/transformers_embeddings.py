@@ -1,28 +1,35 @@
+from typing import Dict
 from utils.logger import logger
 from lib.hugging_face_transformer import HuggingFaceTransformersEmbeddings
 
+TRANSFORMERS_MODELS = {
+    "xenova-bge-small-en-v1.5": ("BGE Small", "BAAI/bge-small-en-v1.5"),
+    "xenova-gte-small": ("GTE Small", "thenlper/gte-small"),
+    "xenova-bert-base-multilingual-uncased": (
+        "Bert Multilingual",
+        "google-bert/bert-base-multilingual-uncased",
+    ),
+}
+
+# Instances load their weights on first use, so they are kept across registry
+# calls instead of being rebuilt (and reloaded) on every request.
+_models: Dict[str, HuggingFaceTransformersEmbeddings] = {}
+
+
+def get_transformers_embeddings(model_name: str) -> HuggingFaceTransformersEmbeddings:
+    if model_name not in _models:
+        _models[model_name] = HuggingFaceTransformersEmbeddings(model_name=model_name)
+    return _models[model_name]
+
 
 async def load_transformers_embeddings_models():
     try:
         embedding_models = {
-            "xenova-bge-small-en-v1.5": {
-                "displayName": "BGE Small",
-                "model": HuggingFaceTransformersEmbeddings(
-                    model_name="BAAI/bge-small-en-v1.5"
-                ),
-            },
-            "xenova-gte-small": {
-                "displayName": "GTE Small",
-                "model": HuggingFaceTransformersEmbeddings(
-                    model_name="thenlper/gte-small"
-                ),
-            },
-            "xenova-bert-base-multilingual-uncased": {
-                "displayName": "Bert Multilingual",
-                "model": HuggingFaceTransformersEmbeddings(
-                    model_name="google-bert/bert-base-multilingual-uncased"
-                ),
-            },
+            key: {
+                "displayName": display_name,
+                "model": get_transformers_embeddings(model_name),
+            }
+            for key, (display_name, model_name) in TRANSFORMERS_MODELS.items()
         }
 
         return embedding_models
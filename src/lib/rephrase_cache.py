@@ -0,0 +1,75 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from config import get_rephrase_cache_size, get_rephrase_cache_ttl
+from lib.chain_cache import get_model_id, get_prompt_version
+from utils.cache import LRUCache
+from utils.metrics import register_cache, register_queue
+
+HISTORY_TAIL_MESSAGES = 2
+
+whitespace_regex = re.compile(r"\s+")
+trailing_punctuation_regex = re.compile(r"[\s?.!]+$")
+
+rephrase_cache = LRUCache(
+    max_size=get_rephrase_cache_size(), ttl=get_rephrase_cache_ttl()
+)
+in_flight: Dict[Hashable, asyncio.Task] = {}
+register_cache("rephrase", rephrase_cache)
+register_queue("rephrase_in_flight", lambda: len(in_flight))
+
+
+def normalize_text(text: str) -> str:
+    text = whitespace_regex.sub(" ", text.strip().lower())
+    return trailing_punctuation_regex.sub("", text)
+
+
+def get_rephrase_key(
+    llm: BaseChatModel, prompt: str, history: List[BaseMessage], query: str
+) -> Tuple[str, ...]:
+    history_tail = "\n".join(
+        f"{type(message).__name__}:{normalize_text(str(message.content))}"
+        for message in history[-HISTORY_TAIL_MESSAGES:]
+    )
+
+    return (
+        get_model_id(llm),
+        get_prompt_version(prompt),
+        history_tail,
+        normalize_text(query),
+    )
+
+
+async def run_rephrase(
+    key: Tuple[str, ...], rephrase: Callable[[], Awaitable[Any]]
+) -> Any:
+    result = await rephrase()
+    rephrase_cache.set(key, result)
+    return result
+
+
+def forget_rephrase(key: Tuple[str, ...], task: asyncio.Task):
+    in_flight.pop(key, None)
+    # Failures reach whoever is still waiting; mark them retrieved otherwise.
+    task.cancelled() or task.exception()
+
+
+async def cached_rephrase(
+    key: Tuple[str, ...], rephrase: Callable[[], Awaitable[Any]]
+) -> Any:
+    cached = rephrase_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Identical questions arriving together share a single LLM call. It runs
+    # in its own task so that the request which started it going away does
+    # not cancel it for the others.
+    task = in_flight.get(key)
+    if task is None:
+        task = asyncio.create_task(run_rephrase(key, rephrase))
+        in_flight[key] = task
+        task.add_done_callback(lambda task: forget_rephrase(key, task))
+
+    return await asyncio.shield(task)
@@ -1,20 +1,11 @@
 import requests
 from typing import List, Dict, Optional, Any
-import logging  # Import logging module
 import httpx
 from dataclasses import dataclass, field
 
 from config import get_searxng_API_endpoint
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Set to DEBUG to capture all levels of log messages
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.StreamHandler()  # Log to console; you can add FileHandler to log to a file
-    ],
-)
-logger = logging.getLogger(__name__)  # Create a logger instance
+from utils.logger import logger
+from utils.metrics import span
 
 
 @dataclass
@@ -80,13 +71,18 @@ async def search_searxng(
     if opts:
         params.update(opts.to_params())
 
-    logger.info(f"Sending request to SearxNG: {url} with params: {params}")
+    logger.debug(
+        "Sending request to SearxNG: %s with params: %s",
+        url,
+        params,
+        extra={"sample": True},
+    )
 
     async with httpx.AsyncClient() as client:
         try:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            logger.info("Received successful response from SearxNG.")
+            with span("searxng"):
+                response = await client.get(url, params=params)
+                response.raise_for_status()
             return response.json()
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error occurred: {e}")
@@ -0,0 +1,186 @@
+import asyncio
+import time
+import pytest
+from benchmarks.fakes import FakeChatModel
+from lib.chain_cache import with_temperature
+from lib.hedged_chat_model import CircuitBreaker, get_breaker
+from lib.llm_scheduler import (
+    Lane,
+    Priority,
+    PrioritySemaphore,
+    TokenBucket,
+    schedule,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    return clock
+
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_hands_slots_out_by_priority():
+    semaphore = PrioritySemaphore(1)
+    await semaphore.acquire(Priority.SUMMARIES)
+    order = []
+
+    async def wait(name: str, priority: Priority):
+        await semaphore.acquire(priority)
+        order.append(name)
+        semaphore.release()
+
+    waiters = [
+        asyncio.create_task(wait("summary", Priority.SUMMARIES)),
+        asyncio.create_task(wait("suggestions", Priority.SUGGESTIONS)),
+        asyncio.create_task(wait("interactive", Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+
+    semaphore.release()
+    await asyncio.gather(*waiters)
+
+    assert order == ["interactive", "suggestions", "summary"]
+    assert semaphore.value == 1
+
+
+@pytest.mark.asyncio
+async def test_priority_semaphore_skips_cancelled_waiters():
+    semaphore = PrioritySemaphore(1)
+    await semaphore.acquire(Priority.INTERACTIVE)
+
+    cancelled = asyncio.create_task(semaphore.acquire(Priority.INTERACTIVE))
+    waiting = asyncio.create_task(semaphore.acquire(Priority.SUMMARIES))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    semaphore.release()
+    await waiting
+
+    assert semaphore.value == 0
+
+
+def test_token_bucket_paces_reservations(clock):
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.reserve(60) == 0
+    assert bucket.reserve(30) == pytest.approx(30)
+
+    clock.now += 30
+    assert bucket.reserve(1) == pytest.approx(1)
+
+
+def test_token_bucket_adjust_refunds(clock):
+    bucket = TokenBucket(per_minute=60)
+    bucket.reserve(60)
+
+    bucket.adjust(-30)
+
+    assert bucket.reserve(30) == 0
+
+
+@pytest.mark.asyncio
+async def test_lane_refunds_a_cancelled_reservation():
+    lane = Lane("test", concurrency=1, tokens_per_minute=600)
+    await lane.acquire(Priority.INTERACTIVE, 600)
+    lane.release()
+
+    # The bucket is empty, so this waits about a minute.
+    waiting = asyncio.create_task(lane.acquire(Priority.INTERACTIVE, 300))
+    await asyncio.sleep(0.01)
+    assert lane.depth() == 1
+
+    waiting.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+
+    assert lane.depth() == 0
+    assert lane.tokens.tokens > -1
+    assert lane.slots.value == 1
+
+
+def make_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", error_threshold=0.5, min_requests=4, window=60, cooldown=30
+    )
+
+
+def test_circuit_breaker_opens_on_error_rate(clock):
+    breaker = make_breaker()
+
+    for ok in (True, False, True):
+        breaker.record(ok)
+    assert breaker.available()
+
+    breaker.record(False)
+    assert not breaker.available()
+
+
+def test_circuit_breaker_ignores_old_outcomes(clock):
+    breaker = make_breaker()
+
+    for _ in range(3):
+        breaker.record(False)
+    clock.now += 61
+    breaker.record(False)
+
+    assert breaker.available()
+
+
+def test_circuit_breaker_lets_one_trial_through_after_cooldown(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    assert breaker.available()
+    assert breaker.start()
+    assert not breaker.available()
+
+    breaker.record(True)
+    assert breaker.available()
+    assert not breaker.start()
+
+
+def test_circuit_breaker_reopens_on_failed_trial(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    breaker.start()
+    breaker.record(False)
+
+    assert not breaker.available()
+    clock.now += 30
+    assert breaker.available()
+
+
+def test_circuit_breaker_abandoned_trial_can_be_retried(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+
+    clock.now += 30
+    breaker.start()
+    breaker.abandon()
+
+    assert breaker.available()
+
+
+def test_temperature_copies_share_a_breaker():
+    llm = schedule("fake", "fake-chat", FakeChatModel())
+    rephrase_llm = with_temperature(llm, 0)
+
+    assert rephrase_llm.temperature == 0
+    assert get_breaker(rephrase_llm) is get_breaker(llm)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from utils.logger import logger
+from db.repository import get_chats, get_chat, get_messages_page, delete_chat
+
+router = APIRouter()
+
+
+@router.get("/")
+async def list_chats():
+    try:
+        chats = await get_chats()
+        return {"chats": chats}
+    except Exception as e:
+        logger.error(f"Error in getting chats: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+
+@router.get("/{chat_id}")
+async def get_chat_by_id(chat_id: str):
+    try:
+        chat = await get_chat(chat_id)
+    except Exception as e:
+        logger.error(f"Error in getting chat {chat_id}: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+    if not chat:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    return chat
+
+
+@router.get("/{chat_id}/messages")
+async def get_chat_messages(
+    chat_id: str,
+    before: Optional[int] = None,
+    limit: int = Query(default=50, ge=1, le=200),
+):
+    try:
+        return await get_messages_page(chat_id, before=before, limit=limit)
+    except Exception as e:
+        logger.error(f"Error in getting messages for chat {chat_id}: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+
+@router.delete("/{chat_id}")
+async def delete_chat_by_id(chat_id: str):
+    try:
+        deleted = await delete_chat(chat_id)
+    except Exception as e:
+        logger.error(f"Error in deleting chat {chat_id}: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Chat not found")
+
+    return {"message": "Chat deleted successfully"}
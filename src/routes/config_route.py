@@ -12,6 +12,9 @@ from config import (
     get_groq_api_key,
     update_config,
 )
+from lib.chain_cache import clear_chain_cache
+from lib.llm_scheduler import llm_scheduler
+from lib.ollama_catalog import ollama_catalog
 from utils.logger import logger
 
 router = APIRouter()
@@ -70,6 +73,12 @@ async def update_config_route(config: Dict):
         # Update the configuration
         update_config(updated_config)
 
+        # Cached chains hold model instances built with the old keys.
+        clear_chain_cache()
+        ollama_catalog.clear()
+        # Saving re-reads config.toml, so edits to [RATE_LIMITS] apply too.
+        llm_scheduler.clear()
+
         return {"message": "Config updated"}
     except Exception as e:
         logger.error(f"Error updating config: {e}")
@@ -3,10 +3,11 @@ from pydantic import BaseModel, Field
 from typing import List, Optional, Any
 from utils.logger import logger
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
+from lib.model_cache import get_custom_openai_chat_model
+from lib.hedged_chat_model import with_failover
 from lib.providers.main import get_available_chat_model_providers
 from chains.image_search_agent import handle_image_search
+from utils.chat_history import load_chat_history
 
 
 class ChatModel(BaseModel):
@@ -18,7 +19,8 @@ class ChatModel(BaseModel):
 
 class ImageSearchBody(BaseModel):
     query: str
-    chatHistory: List[dict]
+    chatHistory: List[dict] = []
+    chatId: Optional[str] = None
     chatModel: Optional[ChatModel] = None
 
 
@@ -32,15 +34,6 @@ router = APIRouter()
 @router.post("/", response_model=ImageSearchResponse)
 async def image_search(body: ImageSearchBody):
     try:
-        chat_history = [
-            (
-                HumanMessage(msg["content"])
-                if msg["role"] == "user"
-                else AIMessage(msg["content"])
-            )
-            for msg in body.chatHistory
-        ]
-
         chat_model_providers = await get_available_chat_model_providers()
 
         chat_model_provider = (
@@ -54,10 +47,6 @@ async def image_search(body: ImageSearchBody):
             else list(chat_model_providers[chat_model_provider].keys())[0]
         )
 
-        logger.info(
-            f"Chat Model Provider: {chat_model_provider}, Chat Model: {chat_model}"
-        )
-
         llm: Optional[BaseChatModel] = None
 
         if body.chatModel and body.chatModel.provider == "custom_openai":
@@ -69,21 +58,27 @@ async def image_search(body: ImageSearchBody):
                     status_code=400, detail="Missing custom OpenAI base URL or key"
                 )
 
-            llm = ChatOpenAI(
+            llm = get_custom_openai_chat_model(
                 model=body.chatModel.model,
                 api_key=body.chatModel.customOpenAIKey,
-                temperature=0.7,
                 base_url=body.chatModel.customOpenAIBaseURL,
             )
         elif chat_model_providers.get(chat_model_provider, {}).get(chat_model):
-            logger.info(
-                f"Chat Model Provider: {chat_model_provider}, Chat Model: {chat_model}"
+            logger.debug(
+                "Chat Model Provider: %s, Chat Model: %s",
+                chat_model_provider,
+                chat_model,
+            )
+            llm = with_failover(
+                chat_model_providers[chat_model_provider][chat_model]["model"],
+                chat_model_providers,
             )
-            llm = chat_model_providers[chat_model_provider][chat_model]["model"]
 
         if not llm:
             raise HTTPException(status_code=400, detail="Invalid model selected")
 
+        chat_history = await load_chat_history(body.chatId, body.chatHistory, llm)
+
         images = await handle_image_search(
             {"query": body.query, "chat_history": chat_history}, llm
         )
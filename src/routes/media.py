@@ -0,0 +1,140 @@
+import asyncio
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import List, Optional
+from utils.logger import logger
+from langchain_core.language_models.chat_models import BaseChatModel
+from lib.model_cache import get_custom_openai_chat_model
+from lib.hedged_chat_model import with_failover
+from lib.providers.main import get_available_chat_model_providers
+from chains.image_search_agent import rephrase_image_query, search_images
+from chains.video_search_agent import search_videos
+from chains.suggestion_generator_agent import (
+    generate_suggestions,
+    SuggestionGeneratorInput,
+)
+from utils.chat_history import load_chat_history
+from utils.format_history import format_chat_history_as_string
+
+
+class ChatModel(BaseModel):
+    provider: str
+    model: str
+    customOpenAIBaseURL: Optional[str] = None
+    customOpenAIKey: Optional[str] = None
+
+
+class MediaBody(BaseModel):
+    query: str
+    chatHistory: List[dict] = []
+    chatId: Optional[str] = None
+    chatModel: Optional[ChatModel] = None
+
+
+router = APIRouter()
+
+
+@router.post("/")
+async def media_search(body: MediaBody):
+    try:
+        chat_model_providers = await get_available_chat_model_providers()
+
+        chat_model_provider = (
+            body.chatModel.provider
+            if body.chatModel
+            else list(chat_model_providers.keys())[0]
+        )
+        chat_model = (
+            body.chatModel.model
+            if body.chatModel
+            else list(chat_model_providers[chat_model_provider].keys())[0]
+        )
+
+        llm: Optional[BaseChatModel] = None
+
+        if body.chatModel and body.chatModel.provider == "custom_openai":
+            if (
+                not body.chatModel.customOpenAIBaseURL
+                or not body.chatModel.customOpenAIKey
+            ):
+                raise HTTPException(
+                    status_code=400, detail="Missing custom OpenAI base URL or key"
+                )
+
+            llm = get_custom_openai_chat_model(
+                model=body.chatModel.model,
+                api_key=body.chatModel.customOpenAIKey,
+                base_url=body.chatModel.customOpenAIBaseURL,
+            )
+        elif chat_model_providers.get(chat_model_provider, {}).get(chat_model):
+            llm = with_failover(
+                chat_model_providers[chat_model_provider][chat_model]["model"],
+                chat_model_providers,
+            )
+
+        if not llm:
+            raise HTTPException(status_code=400, detail="Invalid model selected")
+
+        chat_history = await load_chat_history(body.chatId, body.chatHistory, llm)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in media search: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+    formatted_history = format_chat_history_as_string(chat_history)
+    input_data = {
+        "query": body.query,
+        "chat_history": chat_history,
+        "formatted_history": formatted_history,
+    }
+
+    async def run(result_type: str, producer):
+        try:
+            return {"type": result_type, "data": await producer()}
+        except Exception as e:
+            logger.error(f"Error in media search ({result_type}): {e}")
+            return {
+                "type": "error",
+                "source": result_type,
+                "data": "An error has occurred.",
+            }
+
+    async def suggestions():
+        return await generate_suggestions(
+            SuggestionGeneratorInput(
+                chat_history=chat_history, formatted_history=formatted_history
+            ),
+            llm,
+        )
+
+    async def stream():
+        # Started only once the body is streamed, so that a client gone before
+        # then leaves no LLM call running. Images and videos share one
+        # rephrase; suggestions only need the history so they start right away.
+        rephrased_query = asyncio.create_task(rephrase_image_query(input_data, llm))
+
+        async def images():
+            return await search_images(await rephrased_query)
+
+        async def videos():
+            return await search_videos(await rephrased_query)
+
+        tasks = [
+            asyncio.create_task(run("images", images)),
+            asyncio.create_task(run("videos", videos)),
+            asyncio.create_task(run("suggestions", suggestions)),
+        ]
+
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield json.dumps(await next_result) + "\n"
+
+            yield json.dumps({"type": "end"}) + "\n"
+        finally:
+            for task in tasks + [rephrased_query]:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
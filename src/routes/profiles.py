@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import Optional
+from utils.logger import logger
+from utils.profiler import is_admin_token, profile_store
+
+router = APIRouter()
+
+
+def require_admin(token: Optional[str]):
+    if not is_admin_token(token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+@router.get("/")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    require_admin(x_profile_token)
+
+    try:
+        return {"profiles": await profile_store.list()}
+    except Exception as e:
+        logger.error(f"Error listing profiles: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+
+@router.get("/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    require_admin(x_profile_token)
+
+    path = profile_store.get_report_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(path, media_type="text/html")
@@ -0,0 +1,243 @@
+import json
+import uuid
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketState
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, List, Optional
+from utils.logger import logger
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.embeddings import Embeddings
+from lib.model_cache import get_custom_openai_chat_model
+from lib.hedged_chat_model import with_failover
+from lib.providers.main import (
+    get_available_chat_model_providers,
+    get_available_embedding_model_providers,
+)
+from search.handlers import search_handlers
+from search.planner import Deadline
+from search.event_bus import EventType, SearchEvent, Subscription
+from db.repository import save_chat, save_message
+from utils.chat_history import load_chat_history
+from utils.streaming import with_heartbeats
+
+HEARTBEAT_INTERVAL = 15
+
+
+class ChatModel(BaseModel):
+    provider: str
+    model: str
+    customOpenAIBaseURL: Optional[str] = None
+    customOpenAIKey: Optional[str] = None
+
+
+class EmbeddingModel(BaseModel):
+    provider: str
+    model: str
+
+
+class SearchDeadline(BaseModel):
+    firstSources: Optional[float] = None
+    firstToken: Optional[float] = None
+
+
+class SearchBody(BaseModel):
+    query: str
+    focusMode: str = "webSearch"
+    optimizationMode: str = "balanced"
+    chatHistory: List[dict] = []
+    chatId: Optional[str] = None
+    messageId: Optional[str] = None
+    files: List[str] = []
+    chatModel: Optional[ChatModel] = None
+    embeddingModel: Optional[EmbeddingModel] = None
+    deadline: Optional[SearchDeadline] = None
+
+
+router = APIRouter()
+
+
+async def get_chat_model(chat_model: Optional[ChatModel]) -> BaseChatModel:
+    chat_model_providers = await get_available_chat_model_providers()
+
+    provider = chat_model.provider if chat_model else list(chat_model_providers)[0]
+    model = (
+        chat_model.model if chat_model else list(chat_model_providers[provider])[0]
+    )
+
+    if chat_model and chat_model.provider == "custom_openai":
+        if not chat_model.customOpenAIBaseURL or not chat_model.customOpenAIKey:
+            raise HTTPException(
+                status_code=400, detail="Missing custom OpenAI base URL or key"
+            )
+
+        return get_custom_openai_chat_model(
+            model=chat_model.model,
+            api_key=chat_model.customOpenAIKey,
+            base_url=chat_model.customOpenAIBaseURL,
+        )
+
+    if chat_model_providers.get(provider, {}).get(model):
+        return with_failover(
+            chat_model_providers[provider][model]["model"], chat_model_providers
+        )
+
+    raise HTTPException(status_code=400, detail="Invalid model selected")
+
+
+async def get_embedding_model(embedding_model: Optional[EmbeddingModel]) -> Embeddings:
+    embedding_model_providers = await get_available_embedding_model_providers()
+
+    provider = (
+        embedding_model.provider
+        if embedding_model
+        else list(embedding_model_providers)[0]
+    )
+    model = (
+        embedding_model.model
+        if embedding_model
+        else list(embedding_model_providers[provider])[0]
+    )
+
+    if embedding_model_providers.get(provider, {}).get(model):
+        return embedding_model_providers[provider][model]["model"]
+
+    raise HTTPException(status_code=400, detail="Invalid embedding model selected")
+
+
+async def run_search(body: SearchBody) -> AsyncIterator[SearchEvent]:
+    agent = search_handlers.get(body.focusMode)
+    if not agent:
+        raise HTTPException(status_code=400, detail="Invalid focus mode")
+
+    llm = await get_chat_model(body.chatModel)
+    embeddings = await get_embedding_model(body.embeddingModel)
+    history = await load_chat_history(body.chatId, body.chatHistory, llm)
+
+    message_id = body.messageId or uuid.uuid4().hex
+    deadline = (
+        Deadline(
+            first_sources=body.deadline.firstSources,
+            first_token=body.deadline.firstToken,
+        )
+        if body.deadline
+        else None
+    )
+
+    if body.chatId:
+        save_chat(body.chatId, body.query, body.focusMode, body.files)
+        # Derived from the answer's id so that a retried request stores the
+        # same user message rather than a second one.
+        save_message(body.chatId, f"{message_id}:user", "user", body.query)
+
+    channel = await agent.search_and_answer(
+        body.query,
+        history,
+        llm,
+        embeddings,
+        body.optimizationMode,
+        body.files,
+        deadline,
+        message_id,
+    )
+
+    # Subscribe before yielding to the loop so no event is published into an
+    # empty channel.
+    return persist_answer(body, message_id, channel.subscribe())
+
+
+async def persist_answer(
+    body: SearchBody, message_id: str, subscription: Subscription
+) -> AsyncIterator[SearchEvent]:
+    answer = []
+    sources = []
+
+    try:
+        yield SearchEvent(EventType.MESSAGE, {"messageId": message_id})
+
+        async for event in subscription:
+            if event.type == EventType.CHUNK:
+                answer.append(event.data)
+            elif event.type == EventType.SOURCES:
+                sources = event.data
+            yield event
+    finally:
+        subscription.close()
+
+        if body.chatId and answer:
+            save_message(
+                body.chatId,
+                message_id,
+                "assistant",
+                "".join(answer),
+                {"sources": sources},
+            )
+
+
+@router.post("/")
+async def search(body: SearchBody, request: Request):
+    try:
+        events = await run_search(body)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in search: {e}")
+        raise HTTPException(status_code=500, detail="An error has occurred.")
+
+    async def event_stream():
+        # Closed explicitly so that a client going away stops the search and
+        # persists the partial answer right away, not when it is collected.
+        stream = with_heartbeats(events, HEARTBEAT_INTERVAL)
+        try:
+            async for event in stream:
+                if await request.is_disconnected():
+                    break
+
+                if event is None:
+                    yield ": ping\n\n"
+                else:
+                    yield f"data: {json.dumps(event.to_dict())}\n\n"
+        finally:
+            await stream.aclose()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def search_websocket(websocket: WebSocket):
+    await websocket.accept()
+
+    try:
+        while True:
+            payload = await websocket.receive_json()
+
+            try:
+                events = await run_search(SearchBody(**payload))
+            except (HTTPException, ValidationError) as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                await websocket.send_json({"type": "error", "data": detail})
+                continue
+
+            # Closing the stream as soon as the client goes away stops the
+            # search and persists whatever was answered so far.
+            stream = with_heartbeats(events, HEARTBEAT_INTERVAL)
+            try:
+                async for event in stream:
+                    await websocket.send_json(
+                        event.to_dict() if event else {"type": "ping"}
+                    )
+            except WebSocketDisconnect:
+                logger.info("Search websocket disconnected mid-answer")
+                return
+            finally:
+                await stream.aclose()
+    except WebSocketDisconnect:
+        logger.info("Search websocket disconnected")
+    except Exception as e:
+        logger.error(f"Error in search websocket: {e}")
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=1011)
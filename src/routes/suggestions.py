@@ -3,12 +3,14 @@ from pydantic import BaseModel
 from typing import List, Optional
 from utils.logger import logger
 from lib.providers.main import get_available_chat_model_providers
+from utils.chat_history import load_chat_history
 from chains.suggestion_generator_agent import (
     generate_suggestions,
+    get_precomputed_suggestions,
     SuggestionGeneratorInput,
 )
-from langchain_core.messages import HumanMessage, AIMessage
-from langchain_openai import ChatOpenAI
+from lib.model_cache import get_custom_openai_chat_model
+from lib.hedged_chat_model import with_failover
 from langchain_core.language_models.chat_models import BaseChatModel
 
 
@@ -28,21 +30,19 @@ class Message(BaseModel):
 
 
 class SuggestionsBody(BaseModel):
-    chatHistory: List[Message]
+    chatHistory: List[Message] = []
+    chatId: Optional[str] = None
+    messageId: Optional[str] = None
     chatModel: Optional[ChatModel] = None
 
 
 @router.post("/")
 async def generate_suggestions_endpoint(body: SuggestionsBody):
     try:
-        chat_history = []
-        for msg in body.chatHistory:
-            if msg.role == "user":
-                chat_history.append(HumanMessage(content=msg.content))
-            elif msg.role == "assistant":
-                chat_history.append(AIMessage(content=msg.content))
-            else:
-                chat_history.append(HumanMessage(content=msg.content))
+        if body.messageId:
+            suggestions = await get_precomputed_suggestions(body.messageId)
+            if suggestions is not None:
+                return {"suggestions": suggestions}
 
         chat_model_providers = await get_available_chat_model_providers()
 
@@ -68,22 +68,26 @@ async def generate_suggestions_endpoint(body: SuggestionsBody):
                     status_code=400, detail="Missing custom OpenAI base URL or key"
                 )
 
-            llm = ChatOpenAI(
-                model_name=body.chatModel.model,
-                openai_api_key=body.chatModel.customOpenAIKey,
-                temperature=0.7,
-                configuration={"base_url": body.chatModel.customOpenAIBaseURL},
+            llm = get_custom_openai_chat_model(
+                model=body.chatModel.model,
+                api_key=body.chatModel.customOpenAIKey,
+                base_url=body.chatModel.customOpenAIBaseURL,
             )
 
         elif (
             chat_model_provider in chat_model_providers
             and chat_model in chat_model_providers[chat_model_provider]
         ):
-            llm = chat_model_providers[chat_model_provider][chat_model]["model"]
+            llm = with_failover(
+                chat_model_providers[chat_model_provider][chat_model]["model"],
+                chat_model_providers,
+            )
 
         if not llm:
             raise HTTPException(status_code=400, detail="Invalid model selected")
 
+        chat_history = await load_chat_history(body.chatId, body.chatHistory, llm)
+
         suggestions = await generate_suggestions(
             SuggestionGeneratorInput(chat_history=chat_history), llm
         )
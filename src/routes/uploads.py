@@ -6,7 +6,6 @@ from typing import List, Dict
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
 from fastapi.responses import JSONResponse
 from langchain_core.embeddings import Embeddings
-from langchain_community.document_loaders import PyPDFLoader, Docx2txtLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from lib.providers.main import get_available_embedding_model_providers
@@ -57,9 +56,13 @@ async def upload_files(
             # Load document and split it
             docs = []
             if file_ext == "pdf":
+                from langchain_community.document_loaders import PyPDFLoader
+
                 loader = PyPDFLoader(file_path)
                 docs = loader.load()
             elif file_ext == "docx":
+                from langchain_community.document_loaders import Docx2txtLoader
+
                 loader = Docx2txtLoader(file_path)
                 docs = loader.load()
             elif file_ext == "txt":
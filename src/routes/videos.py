@@ -4,8 +4,9 @@ from pydantic import BaseModel
 from utils.logger import logger
 from lib.providers.main import get_available_chat_model_providers
 from chains.video_search_agent import handle_video_search
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage
+from lib.model_cache import get_custom_openai_chat_model
+from lib.hedged_chat_model import with_failover
+from utils.chat_history import load_chat_history
 
 
 class ChatMessage(BaseModel):
@@ -22,7 +23,8 @@ class ChatModel(BaseModel):
 
 class VideoSearchBody(BaseModel):
     query: str
-    chatHistory: List[dict]
+    chatHistory: List[dict] = []
+    chatId: Optional[str] = None
     chatModel: Optional[ChatModel] = None
 
 
@@ -32,15 +34,6 @@ router = APIRouter()
 @router.post("/", response_model=dict)
 async def video_search(body: VideoSearchBody):
     try:
-        chat_history = [
-            (
-                HumanMessage(msg["content"])
-                if msg["role"] == "user"
-                else AIMessage(msg["content"])
-            )
-            for msg in body.chatHistory
-        ]
-
         chat_model_providers = await get_available_chat_model_providers()
 
         chat_model_provider = (
@@ -64,21 +57,25 @@ async def video_search(body: VideoSearchBody):
                 raise HTTPException(
                     status_code=400, detail="Missing custom OpenAI base URL or key"
                 )
-            llm = ChatOpenAI(
-                model_name=body.chatModel.model,
-                openai_api_key=body.chatModel.customOpenAIKey,
-                temperature=0.7,
+            llm = get_custom_openai_chat_model(
+                model=body.chatModel.model,
+                api_key=body.chatModel.customOpenAIKey,
                 base_url=body.chatModel.customOpenAIBaseURL,
             )
 
         elif chat_model_providers.get(chat_model_provider) and chat_model_providers[
             chat_model_provider
         ].get(chat_model):
-            llm = chat_model_providers[chat_model_provider][chat_model]["model"]
+            llm = with_failover(
+                chat_model_providers[chat_model_provider][chat_model]["model"],
+                chat_model_providers,
+            )
 
         if not llm:
             raise HTTPException(status_code=400, detail="Invalid model selected")
 
+        chat_history = await load_chat_history(body.chatId, body.chatHistory, llm)
+
         videos = await handle_video_search(
             {"chat_history": chat_history, "query": body.query}, llm
         )
@@ -0,0 +1,105 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+from config import (
+    get_answer_cache_max_entries,
+    get_answer_cache_threshold,
+    get_answer_cache_ttl,
+)
+from utils.compute_similarity import compute_similarity
+from utils.metrics import register_cache
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    embedding: List[float]
+    sources: List[Dict[str, Any]]
+    answer: str
+    created_at: float
+
+
+def get_embeddings_id(embeddings: Embeddings) -> str:
+    model = getattr(embeddings, "model", None) or getattr(
+        embeddings, "model_name", None
+    )
+    return f"{type(embeddings).__name__}:{model}"
+
+
+class SemanticAnswerCache:
+    def __init__(self, max_entries: int = 256, ttl: float = 300, threshold=0.95):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.threshold = threshold
+        self.scopes: Dict[Tuple[str, str], Deque[CachedAnswer]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _expire(self, entries: Deque[CachedAnswer]):
+        cutoff = time.monotonic() - self.ttl
+        while entries and entries[0].created_at < cutoff:
+            entries.popleft()
+
+    def lookup(
+        self, scope: Tuple[str, str], embedding: List[float]
+    ) -> Optional[CachedAnswer]:
+        with self._lock:
+            entries = self.scopes.get(scope)
+            if not entries:
+                self.misses += 1
+                return None
+
+            self._expire(entries)
+            candidates = list(entries)
+
+        best, best_similarity = None, self.threshold
+        for entry in candidates:
+            similarity = compute_similarity(embedding, entry.embedding)
+            if similarity >= best_similarity:
+                best, best_similarity = entry, similarity
+
+        if best:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+        return best
+
+    def store(
+        self,
+        scope: Tuple[str, str],
+        query: str,
+        embedding: List[float],
+        sources: List[Dict[str, Any]],
+        answer: str,
+    ):
+        entry = CachedAnswer(
+            query=query,
+            embedding=embedding,
+            sources=sources,
+            answer=answer,
+            created_at=time.monotonic(),
+        )
+
+        with self._lock:
+            entries = self.scopes.setdefault(scope, deque(maxlen=self.max_entries))
+            self._expire(entries)
+            entries.append(entry)
+
+            for key in [key for key, value in self.scopes.items() if not value]:
+                del self.scopes[key]
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.scopes.values())
+
+
+answer_cache = SemanticAnswerCache(
+    max_entries=get_answer_cache_max_entries(),
+    ttl=get_answer_cache_ttl(),
+    threshold=get_answer_cache_threshold(),
+)
+register_cache("answers", answer_cache)
@@ -0,0 +1,163 @@
+import asyncio
+import enum
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+from utils.logger import logger
+
+
+class EventType(str, enum.Enum):
+    MESSAGE = "message"
+    SOURCES = "sources"
+    CHUNK = "response"
+    TIMING = "stages"
+    ERROR = "error"
+    END = "end"
+
+
+class OverflowPolicy(str, enum.Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+@dataclass
+class SearchEvent:
+    type: EventType
+    data: Any = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        if self.data is None:
+            return {"type": self.type.value}
+        return {"type": self.type.value, "data": self.data}
+
+
+_CLOSED = object()
+
+
+class Subscription:
+    def __init__(
+        self, channel: "EventChannel", max_size: int, overflow: OverflowPolicy
+    ):
+        self.channel = channel
+        self.overflow = overflow
+        self.queue: asyncio.Queue = asyncio.Queue(max_size)
+        self.dropped = 0
+        self.closed = False
+
+    async def put(self, event: Any, force: bool = False):
+        if self.closed:
+            return
+
+        if self.overflow == OverflowPolicy.BLOCK:
+            await self.queue.put(event)
+            return
+
+        if self.queue.full():
+            if self.overflow == OverflowPolicy.DROP_NEWEST and not force:
+                self.dropped += 1
+                return
+
+            self.queue.get_nowait()
+            self.dropped += 1
+
+        self.queue.put_nowait(event)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> SearchEvent:
+        if self.closed:
+            raise StopAsyncIteration
+
+        event = await self.queue.get()
+        if event is _CLOSED:
+            self.closed = True
+            raise StopAsyncIteration
+
+        return event
+
+    async def aclose(self):
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        # Unblock a producer waiting on this subscriber's full buffer.
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.channel.unsubscribe(self)
+
+
+class EventChannel:
+    """
+    Fans events from one producer out to any number of subscribers, each with
+    its own bounded buffer. With OverflowPolicy.BLOCK a full buffer pauses the
+    producer; the drop policies keep it running at the cost of lost events.
+    The producer starts on the next loop iteration, so subscribe before
+    awaiting anything after creating the channel. It is cancelled once every
+    subscriber has left.
+    """
+
+    def __init__(
+        self, max_size: int = 256, overflow: OverflowPolicy = OverflowPolicy.BLOCK
+    ):
+        self.max_size = max_size
+        self.overflow = overflow
+        self.subscribers: List[Subscription] = []
+        self.task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def subscribe(
+        self,
+        max_size: Optional[int] = None,
+        overflow: Optional[OverflowPolicy] = None,
+    ) -> Subscription:
+        subscription = Subscription(
+            self, max_size or self.max_size, overflow or self.overflow
+        )
+        self.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription in self.subscribers:
+            self.subscribers.remove(subscription)
+
+        if not self.subscribers and self.task and not self.task.done():
+            self.task.cancel()
+
+    async def publish(self, event: SearchEvent):
+        for subscription in list(self.subscribers):
+            await subscription.put(event)
+
+    async def close(self):
+        if self.closed:
+            return
+
+        self.closed = True
+        for subscription in list(self.subscribers):
+            await subscription.put(_CLOSED, force=True)
+
+    def start(self, producer: AsyncIterator[SearchEvent]) -> asyncio.Task:
+        async def pump():
+            try:
+                async for event in producer:
+                    await self.publish(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in event producer: {e}")
+                await self.publish(
+                    SearchEvent(EventType.ERROR, "An error has occurred.")
+                )
+                await self.publish(SearchEvent(EventType.END))
+            finally:
+                await self.close()
+
+        self.task = asyncio.create_task(pump())
+        return self.task
+
+    def cancel(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
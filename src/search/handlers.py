@@ -0,0 +1,77 @@
+from search.meta_search_agent import MetaSearchAgent, Config
+from prompts.main import prompts
+
+search_handlers = {
+    "webSearch": MetaSearchAgent(
+        Config(
+            focus_mode="webSearch",
+            active_engines=[],
+            query_generator_prompt=prompts["webSearchRetrieverPrompt"],
+            response_prompt=prompts["webSearchResponsePrompt"],
+            rerank=True,
+            rerank_threshold=0.3,
+            search_web=True,
+            summarizer=True,
+        )
+    ),
+    "academicSearch": MetaSearchAgent(
+        Config(
+            focus_mode="academicSearch",
+            active_engines=["arxiv", "google scholar", "pubmed"],
+            query_generator_prompt=prompts["academicSearchRetrieverPrompt"],
+            response_prompt=prompts["academicSearchResponsePrompt"],
+            rerank=True,
+            rerank_threshold=0,
+            search_web=True,
+            summarizer=False,
+        )
+    ),
+    "writingAssistant": MetaSearchAgent(
+        Config(
+            focus_mode="writingAssistant",
+            active_engines=[],
+            query_generator_prompt="",
+            response_prompt=prompts["writingAssistantPrompt"],
+            rerank=True,
+            rerank_threshold=0,
+            search_web=False,
+            summarizer=False,
+        )
+    ),
+    "wolframAlphaSearch": MetaSearchAgent(
+        Config(
+            focus_mode="wolframAlphaSearch",
+            active_engines=["wolframalpha"],
+            query_generator_prompt=prompts["wolframAlphaSearchRetrieverPrompt"],
+            response_prompt=prompts["wolframAlphaSearchResponsePrompt"],
+            rerank=False,
+            rerank_threshold=0,
+            search_web=True,
+            summarizer=False,
+        )
+    ),
+    "youtubeSearch": MetaSearchAgent(
+        Config(
+            focus_mode="youtubeSearch",
+            active_engines=["youtube"],
+            query_generator_prompt=prompts["youtubeSearchRetrieverPrompt"],
+            response_prompt=prompts["youtubeSearchResponsePrompt"],
+            rerank=True,
+            rerank_threshold=0.3,
+            search_web=True,
+            summarizer=False,
+        )
+    ),
+    "redditSearch": MetaSearchAgent(
+        Config(
+            focus_mode="redditSearch",
+            active_engines=["reddit"],
+            query_generator_prompt=prompts["redditSearchRetrieverPrompt"],
+            response_prompt=prompts["redditSearchResponsePrompt"],
+            rerank=True,
+            rerank_threshold=0.3,
+            search_web=True,
+            summarizer=False,
+        )
+    ),
+}
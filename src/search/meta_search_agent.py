@@ -4,7 +4,7 @@ import asyncio
 import pathlib
 import shutil
 import datetime
-from typing import List, Any, Dict
+from typing import List, Any, AsyncIterator, Dict, Optional, Tuple
 from utils.logger import logger
 from utils.documents import get_documents_from_links
 from utils.compute_similarity import compute_similarity
@@ -19,30 +19,45 @@ from langchain_core.prompts import (
     MessagesPlaceholder,
     PromptTemplate,
 )
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_core.output_parsers import StrOutputParser
 from lib.output_parsers.list_line_output_parser import LineListOutputParser
 from lib.output_parsers.line_output_parser import LineOutputParser
+from lib.output_parsers.tag_stream_parser import TagStreamParser
 from langchain_core.documents import Document
 from lib.searxng import search_searxng, SearxngSearchOptions
 from langchain_core.runnables.schema import StreamEvent
+from lib.cross_encoder import get_cross_encoder_reranker
+from lib.chain_cache import (
+    get_or_create_chain,
+    get_model_id,
+    get_prompt_version,
+    with_temperature,
+)
+from lib.rephrase_cache import (
+    cached_rephrase,
+    get_rephrase_key,
+    normalize_text,
+    rephrase_cache,
+)
+from config import (
+    get_rerank_model,
+    get_rerank_budget,
+    get_answer_cache_enabled,
+    get_speculative_search,
+    get_speculative_search_threshold,
+)
+from search.planner import Deadline, PipelinePlanner
+from search.answer_cache import answer_cache, get_embeddings_id
+from search.event_bus import EventChannel, EventType, SearchEvent
+from utils.metrics import GenerationSpan, set_trace_labels, span
+from chains.suggestion_generator_agent import precompute_suggestions
 from dataclasses import dataclass, field
-import eventlet
-
-
-class EventEmitter:
-    def __init__(self):
-        self.events = {}
 
-    def on(self, event_name: str, callback):
-        if event_name not in self.events:
-            self.events[event_name] = []
-        self.events[event_name].append(callback)
+QUALITY_RERANK_CANDIDATES = 40
 
-    def emit(self, event_name: str, data: Any):
-        if event_name in self.events:
-            for callback in self.events[event_name]:
-                callback(data)
+links_parser = LineListOutputParser(key="links")
+question_parser = LineOutputParser(key="question")
 
 
 @dataclass
@@ -54,6 +69,21 @@ class Config:
     query_generator_prompt: str = ""
     response_prompt: str = ""
     active_engines: List[str] = field(default_factory=list)
+    focus_mode: str = "webSearch"
+
+
+def serialize_docs(docs: List[Document]) -> List[Dict[str, Any]]:
+    return [{"pageContent": doc.page_content, "metadata": doc.metadata} for doc in docs]
+
+
+def query_similarity(a: str, b: str) -> float:
+    tokens_a = set(normalize_text(a).split())
+    tokens_b = set(normalize_text(b).split())
+
+    if not tokens_a or not tokens_b:
+        return 0.0
+
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
 
 
 class MetaSearchAgent:
@@ -62,27 +92,96 @@ class MetaSearchAgent:
         self.str_parser = StrOutputParser()
 
     async def create_search_retriever_chain(self, llm: BaseChatModel):
-        llm.temperature = 0
+        return get_or_create_chain(
+            (
+                "retriever",
+                self.config.focus_mode,
+                get_prompt_version(self.config.query_generator_prompt),
+                get_model_id(llm),
+            ),
+            lambda: self.build_search_retriever_chain(llm),
+        )
+
+    def build_search_retriever_chain(self, llm: BaseChatModel):
         runnable_sequence = (
             PromptTemplate.from_template(self.config.query_generator_prompt)
-            | llm
+            | with_temperature(llm, 0)
             | self.str_parser
-            | RunnableLambda(self.parse_links)
         )
 
         return runnable_sequence
 
-    async def parse_links(self, input_text: str, llm: BaseChatModel) -> Dict[str, Any]:
-        links_parser = LineListOutputParser(key="Links")
-        question_parser = LineOutputParser(key="question")
+    async def rephrase_query(
+        self, llm: BaseChatModel, history: List[BaseMessage], query: str
+    ) -> Dict[str, Any]:
+        search_retriever_chain = await self.create_search_retriever_chain(llm)
+
+        return await cached_rephrase(
+            get_rephrase_key(llm, self.config.query_generator_prompt, history, query),
+            lambda: self.stream_rephrase(
+                search_retriever_chain,
+                {
+                    "chat_history": format_chat_history_as_string(history),
+                    "query": query,
+                },
+            ),
+        )
+
+    async def stream_rephrase(
+        self, search_retriever_chain, input_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        if not self.config.summarizer:
+            # The whole output is the question, so there is nothing to cut.
+            return await self.parse_rephrased_output(
+                await search_retriever_chain.ainvoke(input_data)
+            )
+
+        stream_parser = TagStreamParser()
+        stream = search_retriever_chain.astream(input_data)
 
-        links = await links_parser.parse(input_text)
+        try:
+            async for chunk in stream:
+                stream_parser.feed(chunk)
+                question = stream_parser.block(question_parser.key)
+                if question == "not_needed" or stream_parser.is_complete(
+                    question_parser.key, [links_parser.key]
+                ):
+                    break
+        finally:
+            await stream.aclose()
+
+        return await self.parse_rephrased_output(stream_parser.text)
+
+    async def parse_rephrased_output(self, input_text: str) -> Dict[str, Any]:
+        links = links_parser.parse(input_text)
         question = (
             await question_parser.parse(input_text)
             if self.config.summarizer
             else input_text
         )
 
+        return {"question": question, "links": links}
+
+    async def parse_links(
+        self,
+        input_text: str,
+        llm: BaseChatModel,
+        planner: Optional[PipelinePlanner] = None,
+    ) -> Dict[str, Any]:
+        rephrased = await self.parse_rephrased_output(input_text)
+        return await self.retrieve(rephrased, llm, planner)
+
+    async def retrieve(
+        self,
+        rephrased: Dict[str, Any],
+        llm: BaseChatModel,
+        planner: Optional[PipelinePlanner] = None,
+        prefetched_docs: Optional[List[Document]] = None,
+    ) -> Dict[str, Any]:
+        planner = planner or PipelinePlanner()
+        question = rephrased["question"]
+        links = rephrased["links"]
+
         if question == "not_needed":
             return {"query": "", "docs": []}
 
@@ -90,12 +189,14 @@ class MetaSearchAgent:
             question = question if question else "summarize"
             docs = []
 
-            link_docs = get_documents_from_links({"links": links})
+            with planner.stage("fetch"):
+                # Fetching and parsing the pages is blocking work.
+                link_docs = await asyncio.to_thread(get_documents_from_links, links)
             doc_groups = []
 
             for doc in link_docs:
-                existing_doc = (
-                    next(
+                existing_doc = next(
+                    (
                         d
                         for d in doc_groups
                         if d.metadata["url"] == doc.metadata["url"]
@@ -113,32 +214,112 @@ class MetaSearchAgent:
                     existing_doc.page_content += f"\n\n{doc.page_content}"
                     existing_doc.metadata["totalDocs"] += 1
 
-            summarized_docs = await self.summarize_documents(doc_groups, question, llm)
-            docs.extend(summarized_docs)
+            if planner.allow("summarize"):
+                with planner.stage("summarize"):
+                    summarized_docs = await self.summarize_documents(
+                        doc_groups, question, llm
+                    )
+                docs.extend(summarized_docs)
+            else:
+                docs.extend(doc_groups)
+
             return {"query": question, "docs": docs}
+        elif prefetched_docs is not None:
+            return {"query": question, "docs": prefetched_docs}
         else:
-            res = await search_searxng(
-                question,
-                SearxngSearchOptions(language="en", engines=self.config.active_engines),
+            with planner.stage("search"):
+                documents = await self.search_documents(question)
+
+            return {"query": question, "docs": documents}
+
+    async def search_documents(self, question: str) -> List[Document]:
+        res = await search_searxng(
+            question,
+            SearxngSearchOptions(language="en", engines=self.config.active_engines),
+        )
+
+        return [
+            Document(
+                page_content=result.get("content", ""),
+                metadata={
+                    "title": result["title"],
+                    "url": result["url"],
+                    **({"img_src": result["img_src"]} if "img_src" in result else {}),
+                },
             )
+            for result in res.get("results", [])
+        ]
 
-            documents = [
-                Document(
-                    page_content=result["content"],
-                    metadata={
-                        "title": result["title"],
-                        "url": result["url"],
-                        **(
-                            {"img_src": result["img_src"]}
-                            if "img_src" in result
-                            else {}
-                        ),
-                    },
-                )
-                for result in res.get("results", [])
-            ]
+    async def rephrase_with_speculative_search(
+        self,
+        llm: BaseChatModel,
+        history: List[BaseMessage],
+        query: str,
+        planner: PipelinePlanner,
+    ) -> Tuple[Dict[str, Any], Optional[asyncio.Task]]:
+        speculative_search = None
+
+        # While the LLM rephrases, search for the raw message. A cached
+        # rephrase returns immediately, so there is nothing to hide then.
+        if get_speculative_search() and not rephrase_cache.peek(
+            get_rephrase_key(llm, self.config.query_generator_prompt, history, query)
+        ):
+            speculative_search = asyncio.create_task(self.search_documents(query))
+            speculative_search.add_done_callback(
+                lambda task: task.cancelled() or task.exception()
+            )
 
-            return {"query": question, "docs": documents}
+        with planner.stage("rephrase"):
+            try:
+                rephrased = await self.rephrase_query(llm, history, query)
+            except BaseException:
+                if speculative_search:
+                    speculative_search.cancel()
+                raise
+
+        return rephrased, speculative_search
+
+    async def retrieve_rephrased(
+        self,
+        llm: BaseChatModel,
+        query: str,
+        rephrased: Dict[str, Any],
+        speculative_search: Optional[asyncio.Task],
+        planner: PipelinePlanner,
+    ) -> Dict[str, Any]:
+        prefetched_docs = None
+        if speculative_search:
+            question = rephrased["question"]
+            if (
+                not rephrased["links"]
+                and question != "not_needed"
+                and query_similarity(query, question)
+                >= get_speculative_search_threshold()
+            ):
+                with planner.stage("search"):
+                    try:
+                        prefetched_docs = await speculative_search
+                    except Exception as e:
+                        logger.error(f"Speculative search failed: {e}")
+                planner.mark("speculative_search_used")
+            else:
+                speculative_search.cancel()
+
+        return await self.retrieve(rephrased, llm, planner, prefetched_docs)
+
+    async def rephrase_and_retrieve(
+        self,
+        llm: BaseChatModel,
+        history: List[BaseMessage],
+        query: str,
+        planner: PipelinePlanner,
+    ) -> Dict[str, Any]:
+        rephrased, speculative_search = await self.rephrase_with_speculative_search(
+            llm, history, query, planner
+        )
+        return await self.retrieve_rephrased(
+            llm, query, rephrased, speculative_search, planner
+        )
 
     async def summarize_documents(
         self, doc_groups: List[Document], question: str, llm: BaseChatModel
@@ -205,7 +386,7 @@ class MetaSearchAgent:
             Make sure to answer the query in the summary.
             """
 
-            res = await llm.invoke(prompt)
+            res = await llm.ainvoke(prompt)
 
             summarized_doc = Document(
                 page_content=res.content,
@@ -222,45 +403,18 @@ class MetaSearchAgent:
 
         return summarized_docs
 
-    async def create_answering_chain(
-        self,
-        llm: BaseChatModel,
-        file_ids: List[str],
-        embeddings: Embeddings,
-        optimization_mode: str,
-    ):
-        async def retrieve_context(input_data: Dict[str, Any]) -> List[Document]:
-            processed_history = format_chat_history_as_string(
-                input_data["chat_history"]
-            )
-            query = input_data["query"]
-            docs = None
-
-            if self.config.search_web:
-                search_retriever_chain = await self.create_search_retriever_chain(llm)
-                search_result = await search_retriever_chain.invoke(
-                    {"chat_history": processed_history, "query": query}
-                )
-                query = search_result["query"]
-                docs = search_result["docs"]
-
-            sorted_docs = await self.rerank_docs(
-                query, docs or [], file_ids, embeddings, optimization_mode
-            )
-
-            return sorted_docs
-
-        runnable_map = RunnableMap(
-            {
-                "query": lambda x: x["query"],
-                "chat_history": lambda x: x["chat_history"],
-                "date": lambda x: datetime.datetime.now(
-                    datetime.timezone.utc
-                ).isoformat(),
-                "context": RunnableLambda(retrieve_context).pipe(self.process_docs),
-            }
+    async def create_response_chain(self, llm: BaseChatModel):
+        return get_or_create_chain(
+            (
+                "response",
+                self.config.focus_mode,
+                get_prompt_version(self.config.response_prompt),
+                get_model_id(llm),
+            ),
+            lambda: self.build_response_chain(llm),
         )
 
+    def build_response_chain(self, llm: BaseChatModel):
         prompt = ChatPromptTemplate.from_messages(
             [
                 ("system", self.config.response_prompt),
@@ -269,9 +423,93 @@ class MetaSearchAgent:
             ]
         )
 
-        runnable_sequence = runnable_map | prompt | llm | self.str_parser
+        return (prompt | llm | self.str_parser).with_config(
+            run_name="FinalResponseGenerator"
+        )
 
-        return runnable_sequence
+    async def retrieve_sources(
+        self,
+        llm: BaseChatModel,
+        input_data: Dict[str, Any],
+        planner: PipelinePlanner,
+    ) -> List[Document]:
+        query = input_data["query"]
+        docs = None
+
+        if self.config.search_web:
+            if input_data.get("rephrased"):
+                # Already rephrased by the caller to look up the answer cache.
+                rephrased, speculative_search = input_data["rephrased"]
+                search_result = await self.retrieve_rephrased(
+                    llm, query, rephrased, speculative_search, planner
+                )
+            else:
+                search_result = await self.rephrase_and_retrieve(
+                    llm, input_data["chat_history"], query, planner
+                )
+            query = search_result["query"]
+            docs = search_result["docs"]
+
+        sorted_docs = await self.rerank_docs(
+            query,
+            docs or [],
+            input_data["file_ids"],
+            input_data["embeddings"],
+            input_data["optimization_mode"],
+            planner,
+        )
+        planner.mark("sources")
+
+        return sorted_docs
+
+    async def stream_answer(
+        self,
+        llm: BaseChatModel,
+        input_data: Dict[str, Any],
+        planner: PipelinePlanner,
+        cache_entry: Optional[tuple] = None,
+    ) -> AsyncIterator[SearchEvent]:
+        """
+        Runs retrieval, then streams the response chain's tokens directly
+        instead of going through astream_events, which would emit start,
+        stream and end events for every runnable in the graph.
+        """
+        docs = await self.retrieve_sources(llm, input_data, planner)
+        sources = serialize_docs(docs)
+        yield SearchEvent(EventType.SOURCES, sources)
+
+        response_chain = await self.create_response_chain(llm)
+        response_chunks = []
+        generation = GenerationSpan()
+
+        async for chunk in response_chain.astream(
+            {
+                "query": input_data["query"],
+                "chat_history": input_data["chat_history"],
+                "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "context": self.process_docs(docs),
+            }
+        ):
+            if not response_chunks:
+                planner.mark("first_token")
+            generation.chunk()
+            response_chunks.append(chunk)
+            yield SearchEvent(EventType.CHUNK, chunk)
+
+        generation.finish()
+        yield SearchEvent(EventType.TIMING, planner.report())
+
+        # Answers cut short by the deadline or built without any sources
+        # would be served to later questions as if they were complete.
+        if cache_entry and docs and not planner.degradations:
+            scope, question, query_embedding = cache_entry
+            answer_cache.store(
+                scope,
+                question,
+                query_embedding,
+                sources,
+                "".join(response_chunks),
+            )
 
     async def rerank_docs(
         self,
@@ -280,10 +518,13 @@ class MetaSearchAgent:
         file_ids: List[str],
         embeddings: Embeddings,
         optimization_mode: str,
+        planner: Optional[PipelinePlanner] = None,
     ) -> List[Document]:
         if not docs and not file_ids:
             return []
 
+        planner = planner or PipelinePlanner()
+
         files_data = []
         for file_id in file_ids:
             file_path = pathlib.Path(os.path.join(os.getcwd(), "uploads", file_id))
@@ -311,9 +552,40 @@ class MetaSearchAgent:
 
         docs_with_content = [doc for doc in docs if doc.page_content]
 
+        if not self.config.rerank:
+            optimization_mode = "speed"
+
+        num_candidates = len(docs_with_content) + len(files_data)
+        optimization_mode, candidate_limit = planner.plan_rerank(
+            optimization_mode, num_candidates
+        )
+        if candidate_limit < num_candidates:
+            # Both kinds of candidates are scored, so both are trimmed, each
+            # keeping its share of the budget.
+            file_limit = candidate_limit * len(files_data) // num_candidates
+            files_data = files_data[:file_limit]
+            docs_with_content = docs_with_content[: candidate_limit - file_limit]
+
+        with planner.stage(
+            f"rerank:{optimization_mode}",
+            units=len(docs_with_content) + len(files_data),
+        ):
+            return await self.rank_docs(
+                query, docs_with_content, files_data, embeddings, optimization_mode
+            )
+
+    async def rank_docs(
+        self,
+        query: str,
+        docs_with_content: List[Document],
+        files_data: List[Dict[str, Any]],
+        embeddings: Embeddings,
+        optimization_mode: str,
+    ) -> List[Document]:
         if optimization_mode == "speed" or not self.config.rerank:
             if files_data:
-                query_embedding = await embeddings.embed_query(query)
+                with span("embedding"):
+                    query_embedding = await embeddings.aembed_query(query)
                 file_docs = [
                     Document(
                         page_content=file_data["content"],
@@ -348,46 +620,73 @@ class MetaSearchAgent:
             else:
                 return docs_with_content[:15]
         elif optimization_mode == "balanced":
-            doc_embeddings = await embeddings.embed_documents(
-                [doc.page_content for doc in docs_with_content]
+            return await self.rank_by_similarity(
+                query, docs_with_content, files_data, embeddings, limit=15
+            )
+        elif optimization_mode == "quality":
+            candidates = await self.rank_by_similarity(
+                query,
+                docs_with_content,
+                files_data,
+                embeddings,
+                limit=QUALITY_RERANK_CANDIDATES,
             )
-            query_embedding = await embeddings.embed_query(query)
-
-            all_docs = docs_with_content.copy()
-            all_docs += [
-                Document(
-                    page_content=file_data["content"],
-                    metadata={"title": file_data["fileName"], "url": "File"},
-                )
-                for file_data in files_data
-            ]
-
-            all_embeddings = doc_embeddings.copy()
-            all_embeddings += [file_data["embeddings"] for file_data in files_data]
 
-            similarity = [
-                {"index": i, "similarity": compute_similarity(query_embedding, emb)}
-                for i, emb in enumerate(all_embeddings)
-            ]
+            reranker = get_cross_encoder_reranker(get_rerank_model())
+            reranked_docs = await reranker.rerank(
+                query, candidates, budget=get_rerank_budget()
+            )
 
-            sorted_docs = sorted(
-                filter(
-                    lambda sim: sim["similarity"]
-                    > (self.config.rerank_threshold or 0.3),
-                    similarity,
-                ),
-                key=lambda x: x["similarity"],
-                reverse=True,
-            )[:15]
-
-            return [all_docs[sim["index"]] for sim in sorted_docs]
+            return reranked_docs[:15]
         else:
             return docs_with_content[:15]
 
+    async def rank_by_similarity(
+        self,
+        query: str,
+        docs: List[Document],
+        files_data: List[Dict[str, Any]],
+        embeddings: Embeddings,
+        limit: int,
+    ) -> List[Document]:
+        with span("embedding"):
+            doc_embeddings = await embeddings.aembed_documents(
+                [doc.page_content for doc in docs]
+            )
+            query_embedding = await embeddings.aembed_query(query)
+
+        all_docs = docs.copy()
+        all_docs += [
+            Document(
+                page_content=file_data["content"],
+                metadata={"title": file_data["fileName"], "url": "File"},
+            )
+            for file_data in files_data
+        ]
+
+        all_embeddings = doc_embeddings.copy()
+        all_embeddings += [file_data["embeddings"] for file_data in files_data]
+
+        similarity = [
+            {"index": i, "similarity": compute_similarity(query_embedding, emb)}
+            for i, emb in enumerate(all_embeddings)
+        ]
+
+        sorted_docs = sorted(
+            filter(
+                lambda sim: sim["similarity"] > (self.config.rerank_threshold or 0.3),
+                similarity,
+            ),
+            key=lambda x: x["similarity"],
+            reverse=True,
+        )[:limit]
+
+        return [all_docs[sim["index"]] for sim in sorted_docs]
+
     def process_docs(self, docs: List[Document]) -> str:
         return "\n".join([f"{i + 1}. {doc.page_content}" for i, doc in enumerate(docs)])
 
-    async def search_and_answer(
+    async def stream_search_and_answer(
         self,
         message: str,
         history: List[BaseMessage],
@@ -395,40 +694,113 @@ class MetaSearchAgent:
         embeddings: Embeddings,
         optimization_mode: str,
         file_ids: List[str],
-    ) -> EventEmitter:
-        emitter = EventEmitter()
+        deadline: Optional[Deadline] = None,
+        message_id: Optional[str] = None,
+    ) -> AsyncIterator[SearchEvent]:
+        set_trace_labels(llm, self.config.focus_mode)
+        planner = PipelinePlanner(deadline)
+        cache_entry = None
+        answer = ""
+
+        rephrase_result = None
+
+        if get_answer_cache_enabled() and self.config.search_web and not file_ids:
+            # The rephrase done here for the lookup is handed on to retrieval,
+            # together with the speculative search started alongside it.
+            rephrase_result = await self.rephrase_with_speculative_search(
+                llm, history, message, planner
+            )
+            rephrased, speculative_search = rephrase_result
+
+            question = rephrased["question"]
+            if question and question != "not_needed" and not rephrased["links"]:
+                try:
+                    with planner.stage("answer_cache"):
+                        query_embedding = await embeddings.aembed_query(question)
+                        scope = (
+                            self.config.focus_mode,
+                            get_embeddings_id(embeddings),
+                            get_model_id(llm),
+                            optimization_mode,
+                        )
+                        cached = answer_cache.lookup(scope, query_embedding)
+                except BaseException:
+                    if speculative_search:
+                        speculative_search.cancel()
+                    raise
+
+                if cached:
+                    if speculative_search:
+                        speculative_search.cancel()
+                    logger.info(
+                        "Answer cache hit for '%s' ('%s')",
+                        question,
+                        cached.query,
+                        extra={"sample": True},
+                    )
+                    planner.mark("sources")
+                    yield SearchEvent(EventType.SOURCES, cached.sources)
+                    planner.mark("first_token")
+                    yield SearchEvent(EventType.CHUNK, cached.answer)
+                    yield SearchEvent(EventType.TIMING, planner.report())
+                    answer = cached.answer
+                else:
+                    cache_entry = (scope, question, query_embedding)
 
-        answering_chain = await self.create_answering_chain(
-            llm, file_ids, embeddings, optimization_mode
-        )
+        if not answer:
+            stream = self.stream_answer(
+                llm,
+                {
+                    "chat_history": history,
+                    "query": message,
+                    "file_ids": file_ids,
+                    "embeddings": embeddings,
+                    "optimization_mode": optimization_mode,
+                    "rephrased": rephrase_result,
+                },
+                planner,
+                cache_entry,
+            )
 
-        stream = answering_chain.stream_events(
-            {"chat_history": history, "query": message}, version="v1"
-        )
+            async for event in stream:
+                if event.type == EventType.CHUNK:
+                    answer += event.data
+                yield event
+
+        # Suggestions are generated as soon as the answer is complete so that
+        # the follow-up /api/suggestions call finds them ready.
+        if message_id and answer:
+            precompute_suggestions(
+                message_id,
+                history + [HumanMessage(content=message), AIMessage(content=answer)],
+                llm,
+            )
 
-        await self.handle_stream(stream, emitter)
-        return emitter
+        yield SearchEvent(EventType.END)
 
-    async def handle_stream(self, stream, emitter):
-        async for event in stream:
-            if (
-                event["event"] == "on_chain_end"
-                and event["name"] == "FinalSourceRetriever"
-            ):
-                emitter.emit(
-                    "data",
-                    json.dumps({"type": "sources", "data": event["data"]["output"]}),
-                )
-            if (
-                event["event"] == "on_chain_stream"
-                and event["name"] == "FinalResponseGenerator"
-            ):
-                emitter.emit(
-                    "data",
-                    json.dumps({"type": "response", "data": event["data"]["chunk"]}),
-                )
-            if (
-                event["event"] == "on_chain_end"
-                and event["name"] == "FinalResponseGenerator"
-            ):
-                emitter.emit("end")
+    async def search_and_answer(
+        self,
+        message: str,
+        history: List[BaseMessage],
+        llm: BaseChatModel,
+        embeddings: Embeddings,
+        optimization_mode: str,
+        file_ids: List[str],
+        deadline: Optional[Deadline] = None,
+        message_id: Optional[str] = None,
+    ) -> EventChannel:
+        channel = EventChannel()
+        channel.start(
+            self.stream_search_and_answer(
+                message,
+                history,
+                llm,
+                embeddings,
+                optimization_mode,
+                file_ids,
+                deadline,
+                message_id,
+            )
+        )
+
+        return channel
@@ -0,0 +1,134 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from utils.metrics import observe_stage
+
+RERANK_FALLBACKS = {
+    "quality": ["quality", "balanced", "speed"],
+    "balanced": ["balanced", "speed"],
+    "speed": ["speed"],
+}
+
+MIN_RERANK_CANDIDATES = 5
+
+# Running estimates (seconds) shared across requests. Rerank costs are per
+# candidate document, everything else is per stage.
+stage_costs: Dict[str, float] = {
+    "rephrase": 0.8,
+    "search": 1.0,
+    "fetch": 1.5,
+    "summarize": 3.0,
+    "rerank:balanced": 0.01,
+    "rerank:quality": 0.04,
+}
+
+COST_SMOOTHING = 0.2
+
+
+@dataclass
+class Deadline:
+    first_sources: Optional[float] = None
+    first_token: Optional[float] = None
+
+
+class PipelinePlanner:
+    def __init__(self, deadline: Optional[Deadline] = None):
+        self.deadline = deadline or Deadline()
+        self.started_at = time.monotonic()
+        self.stages: List[Dict[str, Any]] = []
+        self.degradations: List[str] = []
+        self.marks: Dict[str, float] = {}
+        self._open: Dict[str, float] = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> Optional[float]:
+        target = self.deadline.first_sources
+        if target is None or "sources" in self.marks:
+            target = self.deadline.first_token
+        if target is None:
+            return None
+        return target - self.elapsed()
+
+    def mark(self, name: str):
+        self.marks.setdefault(name, round(self.elapsed(), 4))
+
+    def start(self, name: str):
+        self._open[name] = time.monotonic()
+
+    def finish(self, name: str, units: int = 1, error: bool = False):
+        start = self._open.pop(name, None)
+        if start is None:
+            return
+
+        duration = time.monotonic() - start
+        self.stages.append(
+            {
+                "name": name,
+                "start": round(start - self.started_at, 4),
+                "duration": round(duration, 4),
+            }
+        )
+        observe_stage_cost(name, duration / max(units, 1))
+        observe_stage(name, duration, error)
+
+    @contextmanager
+    def stage(self, name: str, units: int = 1):
+        self.start(name)
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.finish(name, units, error)
+
+    def allow(self, name: str) -> bool:
+        remaining = self.remaining()
+        if remaining is None or stage_costs.get(name, 0) <= remaining:
+            return True
+
+        self.degradations.append(f"skipped:{name}")
+        return False
+
+    def plan_rerank(self, optimization_mode: str, num_docs: int) -> Tuple[str, int]:
+        remaining = self.remaining()
+        fallbacks = RERANK_FALLBACKS.get(optimization_mode, [optimization_mode])
+
+        if remaining is None or optimization_mode == "speed":
+            return optimization_mode, num_docs
+
+        for mode in fallbacks:
+            per_doc = stage_costs.get(f"rerank:{mode}")
+            if per_doc is None or per_doc * num_docs <= remaining:
+                if mode != optimization_mode:
+                    self.degradations.append(f"rerank:{optimization_mode}->{mode}")
+                return mode, num_docs
+
+            fitting = int(remaining / per_doc)
+            if fitting >= MIN_RERANK_CANDIDATES:
+                if mode != optimization_mode:
+                    self.degradations.append(f"rerank:{optimization_mode}->{mode}")
+                self.degradations.append(f"candidates:{num_docs}->{fitting}")
+                return mode, fitting
+
+        self.degradations.append(f"rerank:{optimization_mode}->speed")
+        return "speed", num_docs
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "stages": self.stages,
+            "degraded": self.degradations,
+            "marks": self.marks,
+        }
+
+
+def observe_stage_cost(name: str, cost: float):
+    previous = stage_costs.get(name)
+    if previous is None:
+        stage_costs[name] = cost
+    else:
+        stage_costs[name] = previous + COST_SMOOTHING * (cost - previous)
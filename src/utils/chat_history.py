@@ -0,0 +1,198 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from config import (
+    get_history_turns,
+    get_history_token_limit,
+    get_history_summary_threshold,
+)
+from chains.history_summarizer_agent import summarize_history
+from db.repository import (
+    get_history_window,
+    get_messages_between,
+    save_history_summary,
+)
+from utils.format_history import estimate_tokens
+from utils.logger import logger
+from utils.metrics import register_queue
+
+summary_tasks: Dict[str, asyncio.Task] = {}
+register_queue(
+    "history_summaries",
+    lambda: sum(1 for task in summary_tasks.values() if not task.done()),
+)
+
+
+def get_role(msg: Any) -> str:
+    return msg["role"] if isinstance(msg, dict) else msg.role
+
+
+def to_base_messages(messages: List[Any]) -> List[BaseMessage]:
+    history = []
+    for msg in messages:
+        role = get_role(msg)
+        content = msg["content"] if isinstance(msg, dict) else msg.content
+
+        if role == "assistant":
+            history.append(AIMessage(content=content))
+        else:
+            history.append(HumanMessage(content=content))
+
+    return history
+
+
+def window_messages(messages: List[Any], turns: int) -> List[Any]:
+    if len(messages) <= turns * 2:
+        return messages
+
+    recent = messages[-turns * 2 :]
+    anchor = next((msg for msg in messages if get_role(msg) == "user"), None)
+
+    if anchor is not None and all(msg is not anchor for msg in recent):
+        return [anchor] + recent
+
+    return recent
+
+
+def truncate_message(msg: Dict[str, Any], tokens: int) -> Dict[str, Any]:
+    content = msg["content"][: max(tokens - 1, 0) * 4]
+    return {**msg, "content": content}
+
+
+def trim_to_token_limit(
+    messages: List[Dict[str, Any]], limit: int
+) -> List[Dict[str, Any]]:
+    """
+    Keeps the newest messages that fit in `limit` tokens. The last turn is
+    always kept, its messages truncated to share the limit when it is too
+    long on its own.
+    """
+    if not messages:
+        return messages
+
+    start = next(
+        (
+            i
+            for i in range(len(messages) - 1, -1, -1)
+            if get_role(messages[i]) == "user"
+        ),
+        len(messages) - 1,
+    )
+    last_turn = messages[start:]
+
+    remaining = limit
+    kept = []
+    for i, msg in enumerate(last_turn):
+        allowance = remaining // (len(last_turn) - i)
+        tokens = estimate_tokens(msg["content"])
+        if tokens > allowance:
+            msg = truncate_message(msg, allowance)
+            tokens = allowance
+        kept.append(msg)
+        remaining -= tokens
+
+    for i in range(start - 1, -1, -1):
+        remaining -= estimate_tokens(messages[i]["content"])
+        if remaining < 0:
+            return messages[i + 1 : start] + kept
+
+    return messages[:start] + kept
+
+
+async def update_summary(
+    chat_id: str,
+    anchor: Dict[str, Any],
+    window_start: int,
+    llm: BaseChatModel,
+):
+    summary = anchor["metadata"].get("summary", "")
+    summarized_up_to = anchor["metadata"].get("summarizedUpTo", anchor["id"] - 1)
+
+    older = await get_messages_between(chat_id, summarized_up_to, window_start)
+    if not older:
+        return
+
+    tokens = sum(estimate_tokens(msg["content"]) for msg in older)
+    # Scrolled-out turns are only worth an LLM call once enough of them have
+    # piled up, the first summary included.
+    if tokens < get_history_summary_threshold():
+        return
+
+    updated_summary = await summarize_history(summary, to_base_messages(older), llm)
+    await save_history_summary(anchor["id"], updated_summary, older[-1]["id"])
+
+
+def schedule_summary_update(
+    chat_id: str, anchor: Dict[str, Any], window_start: int, llm: BaseChatModel
+):
+    if chat_id in summary_tasks and not summary_tasks[chat_id].done():
+        return
+
+    async def run():
+        try:
+            await update_summary(chat_id, anchor, window_start, llm)
+        except Exception as e:
+            logger.error(f"Error updating summary for chat {chat_id}: {e}")
+        finally:
+            summary_tasks.pop(chat_id, None)
+
+    summary_tasks[chat_id] = asyncio.create_task(run())
+
+
+async def compact_history(
+    chat_id: str, window: Dict[str, Any], turns: int, llm: Optional[BaseChatModel]
+) -> List[BaseMessage]:
+    anchor = window["anchor"]
+    messages = window["messages"]
+    summary = anchor["metadata"].get("summary") if anchor else None
+
+    # Messages between the summary (or the anchor) and the window have not
+    # been folded into the summary yet, so they are sent as they are.
+    if anchor and anchor["id"] < messages[0]["id"]:
+        summarized_up_to = anchor["metadata"].get("summarizedUpTo", anchor["id"])
+        messages = (
+            await get_messages_between(
+                chat_id, summarized_up_to, messages[0]["id"], limit=turns * 2
+            )
+            + messages
+        )
+
+    recent = trim_to_token_limit(messages, get_history_token_limit())
+
+    history = []
+    if summary:
+        # A leading exchange rather than a system message, which several
+        # providers reject anywhere but at the start of the prompt.
+        history.extend(
+            [
+                HumanMessage(content="Summarize our conversation so far."),
+                AIMessage(content=summary),
+            ]
+        )
+    elif anchor and anchor["id"] < recent[0]["id"]:
+        history.extend(to_base_messages([anchor]))
+
+    history.extend(to_base_messages(recent))
+
+    # Turns that scrolled out of the window are folded into the summary off
+    # the request path; until that lands they are sent in full.
+    if llm and anchor and anchor["id"] < recent[0]["id"]:
+        schedule_summary_update(chat_id, anchor, recent[0]["id"], llm)
+
+    return history
+
+
+async def load_chat_history(
+    chat_id: Optional[str],
+    messages: List[Any],
+    llm: Optional[BaseChatModel] = None,
+) -> List[BaseMessage]:
+    turns = get_history_turns()
+
+    if chat_id:
+        window = await get_history_window(chat_id, turns)
+        if window["messages"]:
+            return await compact_history(chat_id, window, turns, llm)
+
+    return to_base_messages(window_messages(messages, turns))
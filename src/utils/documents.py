@@ -1,9 +1,9 @@
 import requests
 from bs4 import BeautifulSoup
-import pdfplumber
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from utils.logger import logger
+from utils.metrics import span
 from typing import List
 from io import BytesIO
 
@@ -18,18 +18,49 @@ def get_documents_from_links(links: List[str]):
             link = f"https://{link}"
 
         try:
-            response = requests.get(link)
-            response.raise_for_status()
+            with span("link_fetch"):
+                response = requests.get(link)
+                response.raise_for_status()
+
+            with span("link_extract"):
+                if response.headers["Content-Type"] == "application/pdf":
+                    import pdfplumber
+
+                    with pdfplumber.open(BytesIO(response.content)) as pdf:
+                        pdf_text = ""
+                        for page in pdf.pages:
+                            pdf_text += page.extract_text()
+
+                        parsed_text = " ".join(pdf_text.split())
+                        splitted_text = splitter.split_text(parsed_text)
+                        title = "PDF Document"
+
+                        link_docs = [
+                            Document(
+                                page_content=text,
+                                metadata={"title": title, "url": link},
+                            )
+                            for text in splitted_text
+                        ]
+                        docs.extend(link_docs)
+
+                else:
+                    soup = BeautifulSoup(response.text, "html.parser")
+                    parsed_text = " ".join(
+                        [element.get_text() for element in soup.find_all("p")]
+                    )
+
+                    parsed_text = (
+                        parsed_text.replace("\r\n", " ")
+                        .replace("\n", " ")
+                        .replace("\r", " ")
+                        .strip()
+                    )
 
-            if response.headers["Content-Type"] == "application/pdf":
-                with pdfplumber.open(BytesIO(response.content)) as pdf:
-                    pdf_text = ""
-                    for page in pdf.pages:
-                        pdf_text += page.extract_text()
-
-                    parsed_text = " ".join(pdf_text.split())
                     splitted_text = splitter.split_text(parsed_text)
-                    title = "PDF Document"
+
+                    title_tag = soup.find("title")
+                    title = title_tag.text if title_tag else link
 
                     link_docs = [
                         Document(
@@ -39,30 +70,6 @@ def get_documents_from_links(links: List[str]):
                     ]
                     docs.extend(link_docs)
 
-            else:
-                soup = BeautifulSoup(response.text, "html.parser")
-                parsed_text = " ".join(
-                    [element.get_text() for element in soup.find_all("p")]
-                )
-
-                parsed_text = (
-                    parsed_text.replace("\r\n", " ")
-                    .replace("\n", " ")
-                    .replace("\r", " ")
-                    .strip()
-                )
-
-                splitted_text = splitter.split_text(parsed_text)
-
-                title_tag = soup.find("title")
-                title = title_tag.text if title_tag else link
-
-                link_docs = [
-                    Document(page_content=text, metadata={"title": title, "url": link})
-                    for text in splitted_text
-                ]
-                docs.extend(link_docs)
-
         except Exception as e:
             logger.error(f"Error at generating documents from link {link}: {str(e)}")
             docs.append(
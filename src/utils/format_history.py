@@ -6,3 +6,7 @@ def format_chat_history_as_string(history: List[BaseMessage]) -> str:
     return "\n".join(
         [f"{type(message).__name__}: {message.content}" for message in history]
     )
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
@@ -1,23 +1,139 @@
+import atexit
+import json
 import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List
 import colorlog
+from config import (
+    get_log_file,
+    get_log_format,
+    get_log_level,
+    get_log_rate_limit,
+    get_log_sample_rate,
+)
 
-logger = logging.getLogger("app_logger")
-logger.setLevel(logging.INFO)
+QUEUE_SIZE = 10000
 
-console_handler = colorlog.StreamHandler()
+# Attributes every LogRecord has; anything else came in through `extra`.
+RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
 
-console_formatter = colorlog.ColoredFormatter(
-    "%(log_color)s%(levelname)s: %(message)s", datefmt="%Y-%m-%d %H:%M;%S", reset=True
-)
-console_handler.setFormatter(console_formatter)
 
-file_handler = logging.FileHandler("app.log")
-file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
-file_handler.setFormatter(file_formatter)
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(
+            {k: v for k, v in vars(record).items() if k not in RESERVED_ATTRS}
+        )
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drops hot-path records before they are queued. A record logged with
+    extra={"sample": True} is kept with probability `sample_rate`. One logged
+    with extra={"rate_limit": key} is kept at most once per `rate_limit`
+    seconds per key, and carries the number of records suppressed since.
+    """
+
+    def __init__(self, sample_rate: float, rate_limit: float):
+        super().__init__()
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.last_emitted: Dict[str, float] = {}
+        self.suppressed: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "sample", False) and random.random() >= self.sample_rate:
+            return False
+
+        key = getattr(record, "rate_limit", None)
+        if key is None:
+            return True
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self.last_emitted.get(key, float("-inf")) < self.rate_limit:
+                self.suppressed[key] = self.suppressed.get(key, 0) + 1
+                return False
+
+            self.last_emitted[key] = now
+            record.suppressed = self.suppressed.pop(key, 0)
+
+        return True
+
 
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller: records are dropped once the queue is full."""
 
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def create_handlers() -> List[logging.Handler]:
+    if get_log_format() == "json":
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(JsonFormatter())
+        file_formatter = JsonFormatter()
+    else:
+        console_handler = colorlog.StreamHandler()
+        console_handler.setFormatter(
+            colorlog.ColoredFormatter(
+                "%(log_color)s%(levelname)s: %(message)s",
+                datefmt="%Y-%m-%d %H:%M;%S",
+                reset=True,
+            )
+        )
+        file_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+    handlers = [console_handler]
+
+    if get_log_file():
+        file_handler = logging.FileHandler(get_log_file())
+        file_handler.setFormatter(file_formatter)
+        handlers.append(file_handler)
+
+    return handlers
+
+
+log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+
+queue_handler = DroppingQueueHandler(log_queue)
+queue_handler.addFilter(SamplingFilter(get_log_sample_rate(), get_log_rate_limit()))
+
+# Console and file I/O happen on the listener thread, off the event loop.
+listener = QueueListener(log_queue, *create_handlers())
+listener.start()
+atexit.register(listener.stop)
+
+logger = logging.getLogger("app_logger")
+logger.setLevel(get_log_level())
+logger.addHandler(queue_handler)
 logger.propagate = False
 
+# Third-party libraries (httpx logs every request at INFO) only get through
+# from WARNING up, and through the same queue.
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.WARNING)
+root_logger.addHandler(queue_handler)
+
 logger.info("Logger initialized successfully")
@@ -0,0 +1,185 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+LABELS = ["provider", "model", "focus_mode"]
+
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+stage_duration = Histogram(
+    "perplexica_stage_duration_seconds",
+    "Duration of a request pipeline stage",
+    ["stage", *LABELS],
+    buckets=BUCKETS,
+)
+stage_errors = Counter(
+    "perplexica_stage_errors_total",
+    "Pipeline stages that raised",
+    ["stage", *LABELS],
+)
+first_token_latency = Histogram(
+    "perplexica_generation_first_token_seconds",
+    "Time from the start of answer generation to its first token",
+    LABELS,
+    buckets=BUCKETS,
+)
+last_token_latency = Histogram(
+    "perplexica_generation_last_token_seconds",
+    "Time from the start of answer generation to its last token",
+    LABELS,
+    buckets=BUCKETS,
+)
+generated_chunks = Counter(
+    "perplexica_generation_chunks_total",
+    "Answer chunks streamed to clients",
+    LABELS,
+)
+
+llm_queue_wait = Histogram(
+    "perplexica_llm_queue_wait_seconds",
+    "Time an LLM request waited for its provider's concurrency and rate limits",
+    ["provider", "model", "priority"],
+    buckets=BUCKETS,
+)
+llm_retries = Counter(
+    "perplexica_llm_retries_total",
+    "LLM requests retried after a rate limit or transient error",
+    ["provider", "model", "status"],
+)
+
+llm_hedges = Counter(
+    "perplexica_llm_hedges_total",
+    "Fallback models started because the preferred one was slow or failed",
+    ["reason", "provider", "model"],
+)
+circuit_opened = Counter(
+    "perplexica_llm_circuit_opened_total",
+    "Times a chat model's circuit breaker opened",
+    ["model"],
+)
+
+UNKNOWN_LABELS = {"provider": "unknown", "model": "unknown", "focus_mode": "unknown"}
+
+# Set once per request (or task) so deeply nested stages such as the SearxNG
+# call or link extraction are labelled without threading the model through.
+trace_labels: ContextVar[Dict[str, str]] = ContextVar(
+    "trace_labels", default=UNKNOWN_LABELS
+)
+
+caches: Dict[str, Any] = {}
+queues: Dict[str, Callable[[], int]] = {}
+
+
+def get_llm_labels(llm: Any) -> Dict[str, str]:
+    # Scheduled models are labelled after the model they wrap.
+    llm = getattr(llm, "inner", llm)
+
+    provider = type(llm).__name__
+    if provider.startswith("Chat"):
+        provider = provider[len("Chat") :]
+
+    model = (
+        getattr(llm, "model_name", None) or getattr(llm, "model", None) or "unknown"
+    )
+
+    return {"provider": provider.lower(), "model": str(model)}
+
+
+def set_trace_labels(llm: Any = None, focus_mode: Optional[str] = None):
+    labels = dict(trace_labels.get())
+    if llm is not None:
+        labels.update(get_llm_labels(llm))
+    if focus_mode is not None:
+        labels["focus_mode"] = focus_mode
+
+    trace_labels.set(labels)
+
+
+def observe_stage(stage: str, duration: float, error: bool = False):
+    labels = trace_labels.get()
+    stage_duration.labels(stage=stage, **labels).observe(duration)
+    if error:
+        stage_errors.labels(stage=stage, **labels).inc()
+
+
+@contextmanager
+def span(stage: str):
+    start = time.monotonic()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        observe_stage(stage, time.monotonic() - start, error)
+
+
+class GenerationSpan:
+    """Times a streamed answer from the request to its first and last token."""
+
+    def __init__(self):
+        self.labels = trace_labels.get()
+        self.started_at = time.monotonic()
+        self.chunks = 0
+
+    def chunk(self):
+        if self.chunks == 0:
+            first_token_latency.labels(**self.labels).observe(
+                time.monotonic() - self.started_at
+            )
+        self.chunks += 1
+
+    def finish(self):
+        duration = time.monotonic() - self.started_at
+        last_token_latency.labels(**self.labels).observe(duration)
+        generated_chunks.labels(**self.labels).inc(self.chunks)
+        stage_duration.labels(stage="generation", **self.labels).observe(duration)
+
+
+def register_cache(name: str, cache: Any):
+    """`cache` needs `hits`, `misses` and `__len__`."""
+    caches[name] = cache
+
+
+def register_queue(name: str, depth: Callable[[], int]):
+    queues[name] = depth
+
+
+class RuntimeCollector:
+    """Reads cache and queue state at scrape time instead of on every access."""
+
+    def collect(self):
+        hits = CounterMetricFamily(
+            "perplexica_cache_hits", "Cache lookups that hit", labels=["cache"]
+        )
+        misses = CounterMetricFamily(
+            "perplexica_cache_misses", "Cache lookups that missed", labels=["cache"]
+        )
+        ratio = GaugeMetricFamily(
+            "perplexica_cache_hit_ratio", "Lifetime cache hit ratio", labels=["cache"]
+        )
+        entries = GaugeMetricFamily(
+            "perplexica_cache_entries", "Entries held by a cache", labels=["cache"]
+        )
+
+        for name, cache in caches.items():
+            lookups = cache.hits + cache.misses
+            hits.add_metric([name], cache.hits)
+            misses.add_metric([name], cache.misses)
+            ratio.add_metric([name], cache.hits / lookups if lookups else 0.0)
+            entries.add_metric([name], len(cache))
+
+        depth = GaugeMetricFamily(
+            "perplexica_queue_depth", "Items waiting in a queue", labels=["queue"]
+        )
+        for name, get_depth in queues.items():
+            depth.add_metric([name], get_depth())
+
+        yield from (hits, misses, ratio, entries, depth)
+
+
+REGISTRY.register(RuntimeCollector())
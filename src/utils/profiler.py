@@ -0,0 +1,160 @@
+import asyncio
+import hmac
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+from pyinstrument import Profiler
+from config import (
+    get_profiler_dir,
+    get_profiler_interval,
+    get_profiler_max_reports,
+    get_profiler_sample_rate,
+    get_profiler_token,
+)
+from utils.logger import logger
+
+PROFILE_HEADER = b"x-profile-token"
+PROFILE_QUERY_PARAM = "profile"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    expected = get_profiler_token()
+    return bool(expected and token) and hmac.compare_digest(token, expected)
+
+
+class ProfileStore:
+    """
+    Keeps the newest `max_reports` profiles on disk as an HTML report plus a
+    JSON metadata file each, deleting the oldest as new ones arrive.
+    """
+
+    def __init__(self, directory: str, max_reports: int = 50):
+        self.directory = directory
+        self.max_reports = max_reports
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def _save(self, profiler: Profiler, metadata: Dict[str, Any]):
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(self._path(metadata["id"], "html"), "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+        with open(self._path(metadata["id"], "json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f)
+
+        for stale in self._list()[self.max_reports :]:
+            for extension in ("html", "json"):
+                try:
+                    os.remove(self._path(stale["id"], extension))
+                except FileNotFoundError:
+                    pass
+
+    def _list(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.directory):
+            return []
+
+        reports = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), encoding="utf-8") as f:
+                    reports.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+        return sorted(reports, key=lambda report: report["started_at"], reverse=True)
+
+    async def save(self, profiler: Profiler, metadata: Dict[str, Any]):
+        # Rendering the report is the expensive part, so it runs off the loop.
+        await asyncio.to_thread(self._save, profiler, metadata)
+
+    async def list(self) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._list)
+
+    def get_report_path(self, profile_id: str) -> Optional[str]:
+        # Ids are generated as hex, anything else would be a path traversal.
+        if not profile_id.isalnum():
+            return None
+
+        path = self._path(profile_id, "html")
+        return path if os.path.isfile(path) else None
+
+
+profile_store = ProfileStore(get_profiler_dir(), get_profiler_max_reports())
+
+
+def should_profile(scope: Dict[str, Any]) -> bool:
+    headers = dict(scope.get("headers") or [])
+    if PROFILE_HEADER in headers:
+        token = headers[PROFILE_HEADER].decode("latin-1")
+    else:
+        query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+        token = (query.get(PROFILE_QUERY_PARAM) or [None])[0]
+
+    if is_admin_token(token):
+        return True
+
+    sample_rate = get_profiler_sample_rate()
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+class ProfilerMiddleware:
+    """
+    Runs a request, streamed body included, under pyinstrument when it
+    carries the admin profiling token (X-Profile-Token header or ?profile=)
+    or is picked by PROFILER_SAMPLE_RATE. The report id is returned in the
+    X-Profile-Id response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+        status = None
+
+        async def send_with_profile_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (b"x-profile-id", profile_id.encode("latin-1")),
+                    ],
+                }
+            await send(message)
+
+        profiler = Profiler(interval=get_profiler_interval(), async_mode="enabled")
+        started_at = time.time()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+
+            try:
+                await profile_store.save(
+                    profiler,
+                    {
+                        "id": profile_id,
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status,
+                        "started_at": started_at,
+                        "duration": round(time.time() - started_at, 4),
+                    },
+                )
+            except Exception as e:
+                logger.error(f"Error saving profile {profile_id}: {e}")
@@ -0,0 +1,39 @@
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Optional
+
+
+async def with_heartbeats(
+    events: AsyncIterator[Any], interval: float
+) -> AsyncIterator[Optional[Any]]:
+    """
+    Re-yields events from an async iterator, yielding None whenever no event
+    arrived for `interval` seconds. The source is only advanced when the
+    consumer asks for the next item, so a slow client slows the producer
+    down instead of buffering behind it.
+    """
+    next_event = asyncio.ensure_future(events.__anext__())
+
+    try:
+        while True:
+            done, _ = await asyncio.wait({next_event}, timeout=interval)
+            if not done:
+                yield None
+                continue
+
+            try:
+                event = next_event.result()
+            except StopAsyncIteration:
+                return
+
+            yield event
+            next_event = asyncio.ensure_future(events.__anext__())
+    finally:
+        if not next_event.done():
+            next_event.cancel()
+            with contextlib.suppress(BaseException):
+                await next_event
+
+        aclose = getattr(events, "aclose", None)
+        if aclose:
+            await aclose()
@@ -0,0 +1,54 @@
+import pytest
+from unittest.mock import AsyncMock
+from utils import chat_history
+from utils.chat_history import update_summary
+
+
+def make_message(message_id: int, role: str, content: str, metadata=None):
+    return {
+        "id": message_id,
+        "role": role,
+        "content": content,
+        "metadata": metadata or {},
+    }
+
+
+@pytest.fixture
+def summarizer(monkeypatch):
+    get_messages = AsyncMock()
+    summarize = AsyncMock(return_value="summary")
+    save = AsyncMock()
+
+    monkeypatch.setattr(chat_history, "get_history_summary_threshold", lambda: 1000)
+    monkeypatch.setattr(chat_history, "get_messages_between", get_messages)
+    monkeypatch.setattr(chat_history, "summarize_history", summarize)
+    monkeypatch.setattr(chat_history, "save_history_summary", save)
+
+    return get_messages, summarize, save
+
+
+@pytest.mark.asyncio
+async def test_first_summary_waits_for_the_threshold(summarizer):
+    get_messages, summarize, save = summarizer
+    anchor = make_message(1, "user", "What is X?")
+    get_messages.return_value = [make_message(2, "assistant", "X is Y.")]
+
+    await update_summary("chat", anchor, 3, llm=None)
+
+    summarize.assert_not_called()
+    save.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_summary_is_written_past_the_threshold(summarizer):
+    get_messages, summarize, save = summarizer
+    anchor = make_message(1, "user", "What is X?")
+    get_messages.return_value = [
+        make_message(2, "assistant", "x" * 2400),
+        make_message(3, "user", "y" * 2400),
+    ]
+
+    await update_summary("chat", anchor, 4, llm=None)
+
+    summarize.assert_called_once()
+    save.assert_called_once_with(1, "summary", 3)
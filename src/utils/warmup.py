@@ -0,0 +1,71 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from config import get_rerank_model
+from utils.logger import logger
+
+
+class Warmup:
+    """
+    Loads the provider integrations and the reranker in the background after
+    startup, so the first real request does not pay for them. The server
+    answers (and /api/health reports ready) while this is still running.
+    """
+
+    def __init__(self):
+        self.status = "disabled"
+        self.steps: Dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def _step(self, name: str, step: Callable[[], Awaitable[Any]]):
+        started = time.monotonic()
+        await step()
+        self.steps[name] = round(time.monotonic() - started, 4)
+
+    async def _run(self):
+        from lib.cross_encoder import get_cross_encoder_reranker
+        from lib.providers.main import (
+            get_available_chat_model_providers,
+            get_available_embedding_model_providers,
+        )
+
+        self.status = "running"
+        try:
+            await self._step("chat_providers", get_available_chat_model_providers)
+            await self._step(
+                "embedding_providers", get_available_embedding_model_providers
+            )
+            await self._step(
+                "reranker", get_cross_encoder_reranker(get_rerank_model()).load
+            )
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            logger.error(f"Warm-up failed: {e}")
+            return
+
+        self.status = "done"
+        logger.info("Warm-up finished in %.2fs", sum(self.steps.values()))
+
+    def start(self):
+        if self.task is None:
+            self.status = "pending"
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"status": self.status, "steps": self.steps, "error": self.error}
+
+
+warmup = Warmup()